@@ -0,0 +1,51 @@
+"""Read-through caching of JSON responses with ETag revalidation.
+
+A cached body is returned as-is; when the client already holds it (If-None-Match)
+the answer is an empty 304. Neither path touches the database.
+"""
+import hashlib
+from typing import Any, Awaitable, Callable, Sequence
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ...domain.entities import CacheEntry
+from ...domain.ports import ResponseCachePort
+
+
+def cache_key(request: Request) -> str:
+    query = request.url.query
+    return f"{request.url.path}?{query}" if query else request.url.path
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _respond(request: Request, entry: CacheEntry) -> Response:
+    # no-cache: clients may store the body but must revalidate it with the ETag
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def cached_json(
+    request: Request,
+    cache: ResponseCachePort,
+    tags: Sequence[str],
+    ttl: float,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """Serve ``build()`` through the cache; HTTP errors raised by it are not cached"""
+    key = cache_key(request)
+    entry = await cache.get(key)
+    if entry is None:
+        body = JSONResponse(jsonable_encoder(await build())).body
+        entry = CacheEntry(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+        await cache.set(key, entry, tags, ttl)
+    return _respond(request, entry)
@@ -0,0 +1,115 @@
+"""Streaming serializers for tweet exports.
+
+Each encoder consumes batches of tweets and yields bytes chunks, one per batch, so
+memory stays bounded by the batch size no matter how many rows are exported.
+"""
+import csv
+import io
+import json
+import zlib
+from dataclasses import astuple, fields
+from datetime import datetime
+from typing import AsyncIterator, Callable
+
+from ...domain.entities import Tweet
+
+COLUMNS = [f.name for f in fields(Tweet)]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def ndjson_chunks(batches: AsyncIterator[list[Tweet]]) -> AsyncIterator[bytes]:
+    dumps = json.JSONEncoder(default=_json_default, ensure_ascii=False).encode
+    async for batch in batches:
+        yield "".join(dumps(dict(zip(COLUMNS, astuple(t)))) + "\n" for t in batch).encode()
+
+
+async def csv_chunks(batches: AsyncIterator[list[Tweet]]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    async for batch in batches:
+        for t in batch:
+            # List columns are written as JSON arrays so they survive a round trip
+            writer.writerow([
+                json.dumps(v, ensure_ascii=False) if isinstance(v, list) else
+                v.isoformat() if isinstance(v, datetime) else v
+                for v in astuple(t)
+            ])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def _arrow_schema(pa):
+    strings = pa.list_(pa.string())
+    ts = pa.timestamp("us", tz="UTC")
+    types = {
+        "created_at": ts,
+        "scraped_at": ts,
+        "retweet_count": pa.int64(),
+        "like_count": pa.int64(),
+        "reply_count": pa.int64(),
+        "quote_count": pa.int64(),
+        "query_id": pa.int64(),
+        "hashtags": strings,
+        "mentions": strings,
+        "media_urls": strings,
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in COLUMNS])
+
+
+async def arrow_chunks(batches: AsyncIterator[list[Tweet]]) -> AsyncIterator[bytes]:
+    import pyarrow as pa  # optional dependency, checked by arrow_available()
+
+    schema = _arrow_schema(pa)
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for batch in batches:
+            columns = list(zip(*(astuple(t) for t in batch)))
+            writer.write_batch(pa.record_batch([list(c) for c in columns], schema=schema))
+            yield drain()
+    yield drain()  # end-of-stream marker
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+ENCODERS: dict[str, Callable[[AsyncIterator[list[Tweet]]], AsyncIterator[bytes]]] = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "arrow": arrow_chunks,
+}
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Query as QueryParam
+from fastapi.responses import StreamingResponse
 from ....schemas import (
-    QueryCreateRequest, QueryUpdateRequest, QueryResponse,
+    QueryCreateRequest, QueryUpdateRequest, QueryResponse, QueryRunResponse,
+    HashtagCountResponse, HashtagPairResponse, TweetGrowthResponse, QueryStatsResponse, HourlyStatsResponse,
 )
 from ....domain.entities import Query
-from ....domain.ports import QueryRepositoryPort
-from ....config import get_query_repo
+from ....domain.ports import (
+    QueryRepositoryPort, QueryRunRepositoryPort, TweetRepositoryPort, TweetMetricSnapshotRepositoryPort, StatsRepositoryPort,
+    ResponseCachePort, QUERIES_TAG, query_tag,
+)
+from ....config import (
+    get_query_repo, get_query_run_repo, get_tweet_repo, get_snapshot_repo, get_stats_repo, stream_query_tweets,
+    get_response_cache, RESPONSE_CACHE_TTL_SECONDS,
+)
+from .. import export
+from ..caching import cached_json
 
 
 router = APIRouter(prefix="/queries", tags=["queries"])
@@ -14,6 +27,7 @@ router = APIRouter(prefix="/queries", tags=["queries"])
 async def create_query(
     payload: QueryCreateRequest,
     repo: QueryRepositoryPort = Depends(get_query_repo),
+    cache: ResponseCachePort = Depends(get_response_cache),
 ):
     q = Query(
         id=None,
@@ -24,25 +38,132 @@ async def create_query(
         is_active=payload.is_active,
     )
     saved = await repo.save(q)
-    return QueryResponse(**saved.__dict__)
+    await cache.invalidate([QUERIES_TAG])
+    return QueryResponse(**asdict(saved))
 
 
 @router.get("/{query_id}", response_model=QueryResponse)
-async def get_query(query_id: int, repo: QueryRepositoryPort = Depends(get_query_repo)):
-    q = await repo.get_by_id(query_id)
-    if not q:
+async def get_query(
+    query_id: int,
+    request: Request,
+    repo: QueryRepositoryPort = Depends(get_query_repo),
+    cache: ResponseCachePort = Depends(get_response_cache),
+):
+    async def build() -> QueryResponse:
+        q = await repo.get_by_id(query_id)
+        if not q:
+            raise HTTPException(status_code=404, detail="Query not found")
+        return QueryResponse(**asdict(q))
+
+    return await cached_json(request, cache, [query_tag(query_id)], RESPONSE_CACHE_TTL_SECONDS, build)
+
+
+@router.get("/{query_id}/runs", response_model=list[QueryRunResponse])
+async def list_runs(query_id: int, limit: int = 20, repo: QueryRunRepositoryPort = Depends(get_query_run_repo)):
+    runs = await repo.list_by_query(query_id, limit=limit)
+    return [QueryRunResponse(**asdict(r)) for r in runs]
+
+
+@router.get("/{query_id}/stats", response_model=QueryStatsResponse)
+async def query_stats(
+    query_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    repo: StatsRepositoryPort = Depends(get_stats_repo),
+):
+    """Hourly tweet and engagement counts, read from the query_hourly_stats rollup"""
+    hourly = await repo.query_hourly(query_id, since=since, until=until)
+    return QueryStatsResponse(
+        query_id=query_id,
+        tweets=sum(h.tweets for h in hourly),
+        likes=sum(h.likes for h in hourly),
+        retweets=sum(h.retweets for h in hourly),
+        replies=sum(h.replies for h in hourly),
+        quotes=sum(h.quotes for h in hourly),
+        hourly=[HourlyStatsResponse(**asdict(h)) for h in hourly],
+    )
+
+
+@router.get("/{query_id}/hashtags/top", response_model=list[HashtagCountResponse])
+async def top_hashtags(
+    query_id: int,
+    limit: int = QueryParam(20, ge=1, le=500),
+    since: Optional[datetime] = None,
+    repo: TweetRepositoryPort = Depends(get_tweet_repo),
+):
+    items = await repo.top_hashtags(query_id, limit=limit, since=since)
+    return [HashtagCountResponse(**asdict(i)) for i in items]
+
+
+@router.get("/{query_id}/hashtags/co-occurrence", response_model=list[HashtagPairResponse])
+async def hashtag_cooccurrence(
+    query_id: int,
+    hashtag: Optional[str] = QueryParam(None, description="Only pairs containing this hashtag"),
+    limit: int = QueryParam(20, ge=1, le=500),
+    since: Optional[datetime] = None,
+    repo: TweetRepositoryPort = Depends(get_tweet_repo),
+):
+    items = await repo.hashtag_cooccurrence(query_id, hashtag=hashtag, limit=limit, since=since)
+    return [HashtagPairResponse(**asdict(i)) for i in items]
+
+
+@router.get("/{query_id}/trending", response_model=list[TweetGrowthResponse])
+async def fastest_growing(
+    query_id: int,
+    window_hours: float = QueryParam(24, gt=0, le=24 * 90),
+    limit: int = QueryParam(20, ge=1, le=500),
+    repo: TweetMetricSnapshotRepositoryPort = Depends(get_snapshot_repo),
+):
+    since = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+    items = await repo.fastest_growing(query_id, since=since, limit=limit)
+    return [TweetGrowthResponse(**asdict(i)) for i in items]
+
+
+@router.get("/{query_id}/export")
+async def export_tweets(
+    query_id: int,
+    format: Literal["ndjson", "csv", "arrow"] = "ndjson",
+    gzip: bool = False,
+    repo: QueryRepositoryPort = Depends(get_query_repo),
+):
+    if not await repo.get_by_id(query_id):
         raise HTTPException(status_code=404, detail="Query not found")
-    return QueryResponse(**q.__dict__)
+    if format == "arrow" and not export.arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow")
+    body = export.ENCODERS[format](stream_query_tweets(query_id))
+    filename = f"query-{query_id}.{format}"
+    media_type = export.MEDIA_TYPES[format]
+    if gzip:
+        body = export.gzip_chunks(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("", response_model=list[QueryResponse])
-async def list_active(repo: QueryRepositoryPort = Depends(get_query_repo)):
-    items = await repo.list_active()
-    return [QueryResponse(**q.__dict__) for q in items]
+async def list_active(
+    request: Request,
+    repo: QueryRepositoryPort = Depends(get_query_repo),
+    cache: ResponseCachePort = Depends(get_response_cache),
+):
+    async def build() -> list[QueryResponse]:
+        items = await repo.list_active()
+        return [QueryResponse(**asdict(q)) for q in items]
+
+    return await cached_json(request, cache, [QUERIES_TAG], RESPONSE_CACHE_TTL_SECONDS, build)
 
 
 @router.patch("/{query_id}", response_model=QueryResponse)
-async def update_query(query_id: int, payload: QueryUpdateRequest, repo: QueryRepositoryPort = Depends(get_query_repo)):
+async def update_query(
+    query_id: int,
+    payload: QueryUpdateRequest,
+    repo: QueryRepositoryPort = Depends(get_query_repo),
+    cache: ResponseCachePort = Depends(get_response_cache),
+):
     current = await repo.get_by_id(query_id)
     if not current:
         raise HTTPException(status_code=404, detail="Query not found")
@@ -57,12 +178,18 @@ async def update_query(query_id: int, payload: QueryUpdateRequest, repo: QueryRe
         last_run_at=current.last_run_at,
     )
     saved = await repo.save(updated)
-    return QueryResponse(**saved.__dict__)
+    await cache.invalidate([QUERIES_TAG, query_tag(query_id)])
+    return QueryResponse(**asdict(saved))
 
 
 @router.delete("/{query_id}")
-async def delete_query(query_id: int, repo: QueryRepositoryPort = Depends(get_query_repo)):
+async def delete_query(
+    query_id: int,
+    repo: QueryRepositoryPort = Depends(get_query_repo),
+    cache: ResponseCachePort = Depends(get_response_cache),
+):
     ok = await repo.delete(query_id)
+    await cache.invalidate([QUERIES_TAG, query_tag(query_id)])
     if not ok:
         raise HTTPException(status_code=404, detail="Query not found")
     return {"deleted": True}
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends
-from ....schemas import ScrapeRequest, ScrapeResult, PostResponse, EnhancedScrapeRequest, TweetResponse
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException, Request
+from ....schemas import (
+    ScrapeRequest, ScrapeResult, PostResponse, EnhancedScrapeRequest, TweetResponse, ScrapeJobResponse,
+    ProfileCacheStatsResponse,
+)
 from ....application.use_cases import ScrapeAndStorePostsUseCase, ExecuteQueryUseCase
-from ....domain.ports import PostRepositoryPort, TweetRepositoryPort
+from ....application.jobs import ScrapeJobWorkerPool
+from ....application.profile_cache import ProfileFreshnessCache
+from ....domain.entities import ScrapeJob
+from ....domain.ports import (
+    PostRepositoryPort, TweetRepositoryPort, QueryRepositoryPort, ScrapeJobRepositoryPort, ResponseCachePort, TWEETS_TAG,
+)
 from ....config import (
     get_use_case as get_legacy_use_case,
     get_execute_query_use_case,
     get_tweet_repo,
+    get_query_repo,
     get_repo,
+    get_job_repo,
+    get_job_pool,
+    get_profile_cache,
+    get_response_cache,
+    RESPONSE_CACHE_TTL_SECONDS,
 )
+from ..caching import cached_json
 
 router = APIRouter(prefix="/scrape", tags=["scrape"])
 
@@ -21,7 +37,7 @@ async def scrape(
 @router.get("/recent", response_model=list[PostResponse])
 async def list_recent(repo: PostRepositoryPort = Depends(get_repo)):
     posts = await repo.list_recent(limit=50)
-    return [PostResponse(**p.__dict__) for p in posts]
+    return [PostResponse(**asdict(p)) for p in posts]
 
 
 @router.post("/execute", response_model=ScrapeResult)
@@ -34,10 +50,51 @@ async def execute_query(
         limit=payload.limit,
         include_media=payload.include_media,
         update_user_profiles=payload.update_user_profiles,
+        incremental=payload.incremental,
     )
 
+@router.post("/execute/async", response_model=ScrapeJobResponse, status_code=202)
+async def enqueue_query_execution(
+    payload: EnhancedScrapeRequest,
+    queries: QueryRepositoryPort = Depends(get_query_repo),
+    jobs: ScrapeJobRepositoryPort = Depends(get_job_repo),
+    pool: ScrapeJobWorkerPool = Depends(get_job_pool),
+):
+    if await queries.get_by_id(payload.query_id) is None:
+        raise HTTPException(status_code=404, detail="Query not found")
+    job = await jobs.create(ScrapeJob(
+        id=None,
+        query_id=payload.query_id,
+        params={
+            "limit": payload.limit,
+            "include_media": payload.include_media,
+            "update_user_profiles": payload.update_user_profiles,
+            "incremental": payload.incremental,
+        },
+    ))
+    pool.notify()
+    return ScrapeJobResponse(**asdict(job))
+
+@router.get("/jobs/{job_id}", response_model=ScrapeJobResponse)
+async def get_job(job_id: str, jobs: ScrapeJobRepositoryPort = Depends(get_job_repo)):
+    job = await jobs.get_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ScrapeJobResponse(**asdict(job))
+
 @router.get("/tweets/recent", response_model=list[TweetResponse])
-async def list_recent_tweets(repo: TweetRepositoryPort = Depends(get_tweet_repo)):
-    tweets = await repo.list_recent(limit=50)
-    return [TweetResponse(**t.__dict__) for t in tweets]
+async def list_recent_tweets(
+    request: Request,
+    repo: TweetRepositoryPort = Depends(get_tweet_repo),
+    cache: ResponseCachePort = Depends(get_response_cache),
+):
+    async def build() -> list[TweetResponse]:
+        tweets = await repo.list_recent(limit=50)
+        return [TweetResponse(**asdict(t)) for t in tweets]
+
+    return await cached_json(request, cache, [TWEETS_TAG], RESPONSE_CACHE_TTL_SECONDS, build)
+
 
+@router.get("/profile-cache/stats", response_model=ProfileCacheStatsResponse)
+async def profile_cache_stats(cache: ProfileFreshnessCache = Depends(get_profile_cache)):
+    return ProfileCacheStatsResponse(**cache.stats())
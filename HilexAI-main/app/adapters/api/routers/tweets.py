@@ -0,0 +1,85 @@
+from dataclasses import asdict
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query as QueryParam
+from ....schemas import TweetResponse, TweetPageResponse, MetricSnapshotResponse
+from ....domain.ports import TweetRepositoryPort, TweetMetricSnapshotRepositoryPort
+from ....config import get_tweet_repo, get_snapshot_repo
+
+
+router = APIRouter(prefix="/tweets", tags=["tweets"])
+
+
+@router.get("", response_model=TweetPageResponse)
+async def list_tweets(
+    query_id: Optional[int] = None,
+    author_id: Optional[str] = None,
+    tweet_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    hashtag: Optional[str] = None,
+    mention: Optional[str] = None,
+    cursor: Optional[str] = QueryParam(None, description="next_cursor of the previous page"),
+    limit: int = QueryParam(50, ge=1, le=500),
+    repo: TweetRepositoryPort = Depends(get_tweet_repo),
+):
+    try:
+        page = await repo.list_page(
+            query_id=query_id,
+            author_id=author_id,
+            tweet_type=tweet_type,
+            since=since,
+            until=until,
+            hashtag=hashtag,
+            mention=mention,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return TweetPageResponse(
+        items=[TweetResponse(**asdict(t)) for t in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get("/search", response_model=TweetPageResponse)
+async def search_tweets(
+    q: str = QueryParam(..., min_length=1, description="Search text"),
+    mode: Literal["web", "phrase", "prefix"] = "web",
+    query_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    order: Literal["rank", "recent"] = "rank",
+    cursor: Optional[str] = QueryParam(None, description="next_cursor of the previous page"),
+    limit: int = QueryParam(50, ge=1, le=500),
+    repo: TweetRepositoryPort = Depends(get_tweet_repo),
+):
+    try:
+        page = await repo.search_text(
+            q,
+            mode=mode,
+            query_id=query_id,
+            since=since,
+            until=until,
+            order=order,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TweetPageResponse(
+        items=[TweetResponse(**asdict(t)) for t in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get("/{tweet_id}/metrics", response_model=list[MetricSnapshotResponse])
+async def engagement_curve(
+    tweet_id: str,
+    since: Optional[datetime] = None,
+    limit: int = QueryParam(1000, ge=1, le=10000),
+    repo: TweetMetricSnapshotRepositoryPort = Depends(get_snapshot_repo),
+):
+    snapshots = await repo.curve(tweet_id, since=since, limit=limit)
+    return [MetricSnapshotResponse(**asdict(s)) for s in snapshots]
@@ -0,0 +1,21 @@
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException
+from ....schemas import AuthorStatsResponse
+from ....domain.ports import StatsRepositoryPort
+from ....config import get_stats_repo
+
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/{user_id}/stats", response_model=AuthorStatsResponse)
+async def author_stats(user_id: str, repo: StatsRepositoryPort = Depends(get_stats_repo)):
+    """Running totals over the author's stored tweets, read from the author_stats rollup"""
+    stats = await repo.get_author(user_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No stats for this user")
+    return AuthorStatsResponse(
+        **asdict(stats),
+        avg_likes=stats.likes / stats.tweets if stats.tweets else 0.0,
+        avg_retweets=stats.retweets / stats.tweets if stats.tweets else 0.0,
+    )
@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence
+
+from ...domain.entities import CacheEntry
+from ...domain.ports import ResponseCachePort
+
+
+class InMemoryResponseCache(ResponseCachePort):
+    """Process-local LRU with per-entry TTL and tag-based invalidation"""
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_entries = max_entries
+        self._clock = clock
+        # key -> (expires_at, entry, tags)
+        self._entries: OrderedDict[str, tuple[float, CacheEntry, tuple[str, ...]]] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+
+    def _drop(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[0] <= self._clock():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    async def set(self, key: str, entry: CacheEntry, tags: Sequence[str], ttl: float) -> None:
+        self._drop(key)
+        self._entries[key] = (self._clock() + ttl, entry, tuple(tags))
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Sequence[str]) -> None:
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._drop(key)
@@ -0,0 +1,50 @@
+from typing import Optional, Sequence
+
+from ...domain.entities import CacheEntry
+from ...domain.ports import ResponseCachePort
+
+
+class RedisResponseCache(ResponseCachePort):
+    """Cache shared by every app process through a Redis-compatible server.
+
+    Needs the optional ``redis`` package. Each tag is a set of the keys stored under
+    it; invalidating a tag deletes those keys and the set in one round trip.
+    """
+
+    def __init__(self, url: str, prefix: str = "hilex:cache:") -> None:
+        import redis.asyncio as redis  # optional dependency
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self._prefix}tag:{tag}"
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self._redis.get(self._key(key))
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return CacheEntry(body=body, etag=etag.decode())
+
+    async def set(self, key: str, entry: CacheEntry, tags: Sequence[str], ttl: float) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), entry.etag.encode() + b"\n" + entry.body, px=int(ttl * 1000))
+            for tag in tags:
+                pipe.sadd(self._tag(tag), self._key(key))
+                pipe.pexpire(self._tag(tag), int(ttl * 1000) * 2)
+            await pipe.execute()
+
+    async def invalidate(self, tags: Sequence[str]) -> None:
+        # Delete every key of every tag, then the tag sets, atomically on the server
+        script = (
+            "for _, tag in ipairs(KEYS) do "
+            "local keys = redis.call('SMEMBERS', tag) "
+            "for _, k in ipairs(keys) do redis.call('DEL', k) end "
+            "redis.call('DEL', tag) end return 0"
+        )
+        if tags:
+            await self._redis.eval(script, len(tags), *(self._tag(t) for t in tags))
@@ -0,0 +1,39 @@
+"""Column-level read path: rows go straight into domain entities.
+
+Each mapper selects exactly the entity's fields, in dataclass order, as plain
+table columns. Rows therefore never become ORM instances (no identity map, no
+attribute instrumentation) and a row tuple is already the entity's positional
+argument list, so mapping is a single ``Entity(*row)`` call per row.
+"""
+from dataclasses import fields
+from itertools import starmap
+from typing import Generic, Iterable, Optional, Sequence, TypeVar
+
+from sqlalchemy import Select, Table, select
+
+from ...domain.entities import Query, Tweet, TwitterUser
+from .models import QueryORM, TweetORM, UserORM
+
+E = TypeVar("E")
+
+
+class RowMapper(Generic[E]):
+    def __init__(self, entity: type[E], table: Table) -> None:
+        self.entity = entity
+        # Raises at import time if an entity field has no matching column
+        self.columns = tuple(table.c[f.name] for f in fields(entity))
+
+    def select(self, *extra) -> Select:
+        """SELECT of the entity columns; ``extra`` expressions are appended after them"""
+        return select(*self.columns, *extra)
+
+    def one(self, row: Optional[Sequence]) -> Optional[E]:
+        return None if row is None else self.entity(*row[:len(self.columns)])
+
+    def all(self, rows: Iterable[Sequence]) -> list[E]:
+        return list(starmap(self.entity, rows))
+
+
+QUERY_ROWS = RowMapper(Query, QueryORM.__table__)
+TWEET_ROWS = RowMapper(Tweet, TweetORM.__table__)
+USER_ROWS = RowMapper(TwitterUser, UserORM.__table__)
@@ -1,6 +1,7 @@
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, Integer, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import String, DateTime, Integer, BigInteger, Boolean, Text, ForeignKey, JSON, Index, Computed, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from ...infrastructure.db import Base
 
 class QueryORM(Base):
@@ -15,10 +16,43 @@ class QueryORM(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    high_water_tweet_id: Mapped[str | None] = mapped_column(String(64), nullable=True)  # newest ingested tweet
+    high_water_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # Relationship to tweets
     tweets: Mapped[list["TweetORM"]] = relationship("TweetORM", back_populates="query")
 
+class QueryRunORM(Base):
+    """Outcome of each scheduled query execution"""
+    __tablename__ = "query_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    query_id: Mapped[int] = mapped_column(Integer, ForeignKey("queries.id", ondelete="CASCADE"), nullable=False, index=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="running")  # running, succeeded, failed, skipped
+    found: Mapped[int] = mapped_column(Integer, default=0)
+    saved: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+class ScrapeJobORM(Base):
+    """Queued /scrape/execute runs processed by the background worker pool"""
+    __tablename__ = "scrape_jobs"
+    __table_args__ = (Index("ix_scrape_jobs_status_created_at", "status", "created_at"),)
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    query_id: Mapped[int] = mapped_column(Integer, ForeignKey("queries.id", ondelete="CASCADE"), nullable=False)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False)  # limit, include_media, update_user_profiles
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    progress: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # ScrapeResult payload
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
 class UserORM(Base):
     """Twitter user profiles"""
     __tablename__ = "users"
@@ -41,13 +75,16 @@ class UserORM(Base):
     recent_tweets: Mapped[list["UserRecentTweetORM"]] = relationship("UserRecentTweetORM", back_populates="user")
 
 class TweetORM(Base):
-    """Tweet data with enhanced fields"""
+    """Tweet data with enhanced fields, range-partitioned by created_at month"""
     __tablename__ = "tweets"
+    # Partitions are managed by app/infrastructure/partitions.py
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
+    # The partition key must be part of the primary key; a tweet's created_at never changes
     tweet_id: Mapped[str] = mapped_column(String(64), primary_key=True)
     text: Mapped[str] = mapped_column(Text, nullable=False)
     author_id: Mapped[str] = mapped_column(String(64), ForeignKey("users.user_id"), nullable=False, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, index=True)
     
     # Metrics
     retweet_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -57,9 +94,9 @@ class TweetORM(Base):
     
     # Tweet type and content
     tweet_type: Mapped[str] = mapped_column(String(20), default="original")  # original, reply, retweet, quote
-    hashtags: Mapped[list] = mapped_column(JSON, nullable=True)  # List of hashtags
-    mentions: Mapped[list] = mapped_column(JSON, nullable=True)  # List of mentioned users
-    media_urls: Mapped[list] = mapped_column(JSON, nullable=True)  # List of media URLs
+    hashtags: Mapped[list] = mapped_column(JSONB(none_as_null=True), nullable=True)  # List of hashtags (lowercase)
+    mentions: Mapped[list] = mapped_column(JSONB(none_as_null=True), nullable=True)  # List of mentioned users (lowercase)
+    media_urls: Mapped[list] = mapped_column(JSONB(none_as_null=True), nullable=True)  # List of media URLs
     
     # Source tracking
     query_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("queries.id"), nullable=True, index=True)
@@ -69,24 +106,95 @@ class TweetORM(Base):
     # Timestamps
     scraped_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     
+    # Full-text search; maintained by PostgreSQL ('simple' config: tweets are multilingual)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True), deferred=True
+    )
+    
     # Relationships
     author: Mapped["UserORM"] = relationship("UserORM", back_populates="tweets")
     query: Mapped["QueryORM"] = relationship("QueryORM", back_populates="tweets")
-    media_files: Mapped[list["MediaFileORM"]] = relationship("MediaFileORM", back_populates="tweet")
+    media_files: Mapped[list["MediaFileORM"]] = relationship(
+        "MediaFileORM",
+        primaryjoin="TweetORM.tweet_id == foreign(MediaFileORM.tweet_id)",
+        back_populates="tweet",
+        viewonly=True,
+    )
+
+# Keyset pagination over (created_at, tweet_id), newest first, optionally per query/author
+Index("ix_tweets_created_at_tweet_id", TweetORM.created_at.desc(), TweetORM.tweet_id.desc())
+Index("ix_tweets_query_created_at_tweet_id", TweetORM.query_id, TweetORM.created_at.desc(), TweetORM.tweet_id.desc())
+Index("ix_tweets_author_created_at_tweet_id", TweetORM.author_id, TweetORM.created_at.desc(), TweetORM.tweet_id.desc())
+Index("ix_tweets_search_vector", TweetORM.search_vector, postgresql_using="gin")
+# Containment lookups (hashtags @> '["foo"]')
+Index("ix_tweets_hashtags", TweetORM.hashtags, postgresql_using="gin", postgresql_ops={"hashtags": "jsonb_path_ops"})
+Index("ix_tweets_mentions", TweetORM.mentions, postgresql_using="gin", postgresql_ops={"mentions": "jsonb_path_ops"})
+
+class TweetMetricSnapshotORM(Base):
+    """Append-only engagement history, one row per re-observation with changed metrics"""
+    __tablename__ = "tweet_metric_snapshots"
+    # BRIN: rows arrive in observed_at order, so a tiny block-range index covers time windows
+    __table_args__ = (Index("ix_tweet_metric_snapshots_observed_at", "observed_at", postgresql_using="brin"),)
+
+    tweet_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    observed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    like_count: Mapped[int] = mapped_column(Integer, default=0)
+    retweet_count: Mapped[int] = mapped_column(Integer, default=0)
+    reply_count: Mapped[int] = mapped_column(Integer, default=0)
+    quote_count: Mapped[int] = mapped_column(Integer, default=0)
+
+class QueryHourlyStatsORM(Base):
+    """Rollup: tweets and engagement per query and UTC hour, refreshed on ingest"""
+    __tablename__ = "query_hourly_stats"
+
+    query_id: Mapped[int] = mapped_column(Integer, ForeignKey("queries.id", ondelete="CASCADE"), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    tweets: Mapped[int] = mapped_column(Integer, default=0)
+    likes: Mapped[int] = mapped_column(BigInteger, default=0)
+    retweets: Mapped[int] = mapped_column(BigInteger, default=0)
+    replies: Mapped[int] = mapped_column(BigInteger, default=0)
+    quotes: Mapped[int] = mapped_column(BigInteger, default=0)
+
+class AuthorStatsORM(Base):
+    """Rollup: running totals per author over their stored tweets, refreshed on ingest"""
+    __tablename__ = "author_stats"
+
+    author_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    tweets: Mapped[int] = mapped_column(Integer, default=0)
+    likes: Mapped[int] = mapped_column(BigInteger, default=0)
+    retweets: Mapped[int] = mapped_column(BigInteger, default=0)
+    replies: Mapped[int] = mapped_column(BigInteger, default=0)
+    quotes: Mapped[int] = mapped_column(BigInteger, default=0)
+    first_tweet_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_tweet_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 class MediaFileORM(Base):
-    """Media files"""
+    """Media files, partitioned like their tweets so retention drops both together"""
     __tablename__ = "media_files"
+    __table_args__ = (
+        # One row per attachment of a tweet; the partition key must be part of any unique key
+        UniqueConstraint("tweet_id", "original_url", "tweet_created_at", name="uq_media_files_tweet_url"),
+        {"postgresql_partition_by": "RANGE (tweet_created_at)"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    tweet_id: Mapped[str] = mapped_column(String(64), ForeignKey("tweets.tweet_id"), nullable=False, index=True)
+    tweet_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # No foreign key: tweets is partitioned, and partitions are dropped independently
+    tweet_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     media_type: Mapped[str] = mapped_column(String(20), nullable=False)  # photo, video
     original_url: Mapped[str] = mapped_column(String(512), nullable=False)  # Original Twitter URL
     file_size: Mapped[int | None] = mapped_column(Integer, nullable=True)  # File size in bytes
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)  # content address in the media store
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     
     # Relationship
-    tweet: Mapped["TweetORM"] = relationship("TweetORM", back_populates="media_files")
+    tweet: Mapped["TweetORM"] = relationship(
+        "TweetORM",
+        primaryjoin="foreign(MediaFileORM.tweet_id) == TweetORM.tweet_id",
+        back_populates="media_files",
+        viewonly=True,
+    )
 
 class UserRecentTweetORM(Base):
     """Last 3 tweets for each user"""
@@ -1,23 +1,76 @@
-from typing import Optional, Sequence
-from sqlalchemy import select, update, delete
+import base64
+import json
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+from sqlalchemy import BigInteger, DateTime, Integer, String, cast, column, select, insert, update, delete, func, literal, literal_column, true, tuple_, values
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...domain.entities import (
     ScrapedPost,
-    Query, TwitterUser, Tweet, MediaFile, UserRecentTweet,
+    Query, QueryRun, ScrapeJob, TwitterUser, Tweet, TweetPage, MediaFile, HashtagCount, HashtagPair, MetricSnapshot, TweetGrowth, QueryHourlyStats, AuthorStats,
+    UserRecentTweet, UpsertResult, TweetDelta,
 )
 from ...domain.ports import (
     PostRepositoryPort,
-    QueryRepositoryPort, TwitterUserRepositoryPort,
-    TweetRepositoryPort, MediaFileRepositoryPort, UserRecentTweetRepositoryPort,
+    QueryRepositoryPort, QueryRunRepositoryPort, ScrapeJobRepositoryPort, TwitterUserRepositoryPort,
+    TweetRepositoryPort, TweetMetricSnapshotRepositoryPort, StatsRepositoryPort, MediaFileRepositoryPort,
+    UserRecentTweetRepositoryPort,
 )
+from ...infrastructure.partitions import ensure_partitions_for, missing_months
+from .mappers import QUERY_ROWS, TWEET_ROWS, USER_ROWS
 from .models import (
-    PostORM, QueryORM, UserORM, TweetORM, MediaFileORM, UserRecentTweetORM,
+    PostORM, QueryORM, QueryRunORM, ScrapeJobORM, UserORM, TweetORM, TweetMetricSnapshotORM, QueryHourlyStatsORM,
+    AuthorStatsORM, MediaFileORM, UserRecentTweetORM,
 )
 
-class SqlAlchemyPostRepository(PostRepositoryPort):
-    def __init__(self, session: AsyncSession):
+# Rows per multi-row INSERT; keeps bind parameters well below asyncpg's 32767 limit
+_BULK_CHUNK_SIZE = 1000
+_TS_CONFIG = literal_column("'simple'::regconfig")  # must match the search_vector expression
+_WORD_RE = re.compile(r"\w+")
+
+
+def _chunks(items: list, size: int = _BULK_CHUNK_SIZE) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _encode_cursor(*key) -> str:
+    raw = json.dumps([k.isoformat() if isinstance(k, datetime) else k for k in key])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _normalize_tag(tag: str) -> str:
+    return tag.strip().lstrip("#@").lower()
+
+
+class _SqlAlchemyRepository:
+    """Commits after every write, unless it takes part in a unit of work.
+
+    With ``autocommit=False`` writes are only flushed; the unit of work sharing the
+    session decides when the transaction commits.
+    """
+
+    def __init__(self, session: AsyncSession, autocommit: bool = True):
         self._session = session
+        self._autocommit = autocommit
+
+    async def _commit(self) -> None:
+        if self._autocommit:
+            await self._session.commit()
+        else:
+            await self._session.flush()
+
 
+class SqlAlchemyPostRepository(_SqlAlchemyRepository, PostRepositoryPort):
     async def save_many(self, posts: list[ScrapedPost]) -> int:
         if not posts:
             return 0
@@ -33,7 +86,7 @@ class SqlAlchemyPostRepository(PostRepositoryPort):
                 id=p.id, author=p.author, text=p.text,
                 created_at=p.created_at, source=p.source, url=p.url
             ))
-        await self._session.commit()
+        await self._commit()
         return len(to_insert)
 
     async def get_by_id(self, post_id: str) -> Optional[ScrapedPost]:
@@ -57,94 +110,192 @@ class SqlAlchemyPostRepository(PostRepositoryPort):
         ]
 
 
-class SqlAlchemyQueryRepository(QueryRepositoryPort):
-    def __init__(self, session: AsyncSession):
-        self._session = session
-
+class SqlAlchemyQueryRepository(_SqlAlchemyRepository, QueryRepositoryPort):
     async def save(self, query: Query) -> Query:
+        values = dict(
+            name=query.name,
+            search_text=query.search_text,
+            filters=query.filters,
+            schedule_interval=query.schedule_interval,
+            is_active=query.is_active,
+        )
         if query.id:
-            await self._session.execute(
-                update(QueryORM)
-                .where(QueryORM.id == query.id)
-                .values(
-                    name=query.name,
-                    search_text=query.search_text,
-                    filters=query.filters,
-                    schedule_interval=query.schedule_interval,
-                    is_active=query.is_active,
-                )
-            )
-            await self._session.commit()
-            db_obj = await self._session.get(QueryORM, query.id)
+            stmt = update(QueryORM).where(QueryORM.id == query.id).values(**values)
         else:
-            db_obj = QueryORM(
-                name=query.name,
-                search_text=query.search_text,
-                filters=query.filters,
-                schedule_interval=query.schedule_interval,
-                is_active=query.is_active,
+            stmt = insert(QueryORM).values(**values)
+        row = (await self._session.execute(stmt.returning(*QUERY_ROWS.columns))).first()
+        await self._commit()
+        return QUERY_ROWS.one(row)
+
+    async def get_by_id(self, query_id: int) -> Optional[Query]:
+        row = (await self._session.execute(QUERY_ROWS.select().where(QueryORM.id == query_id))).first()
+        return QUERY_ROWS.one(row)
+
+    async def list_active(self) -> list[Query]:
+        rows = (await self._session.execute(QUERY_ROWS.select().where(QueryORM.is_active == True))).all()
+        return QUERY_ROWS.all(rows)
+
+    async def update_last_run(self, query_id: int, timestamp) -> None:
+        await self._session.execute(
+            update(QueryORM).where(QueryORM.id == query_id).values(last_run_at=timestamp)
+        )
+        await self._commit()
+
+    async def advance_high_water(self, query_id: int, tweet_id: str, created_at) -> None:
+        # Only ever move forward; tweet ids are snowflakes, so numeric order is time order
+        await self._session.execute(
+            update(QueryORM)
+            .where(
+                QueryORM.id == query_id,
+                (QueryORM.high_water_tweet_id.is_(None))
+                | (cast(QueryORM.high_water_tweet_id, BigInteger) < int(tweet_id)),
             )
-            self._session.add(db_obj)
-            await self._session.commit()
-            await self._session.refresh(db_obj)
-        return Query(
-            id=db_obj.id,
-            name=db_obj.name,
-            search_text=db_obj.search_text,
-            filters=db_obj.filters,
-            schedule_interval=db_obj.schedule_interval,
-            is_active=db_obj.is_active,
-            created_at=db_obj.created_at,
-            last_run_at=db_obj.last_run_at,
+            .values(high_water_tweet_id=tweet_id, high_water_created_at=created_at)
         )
+        await self._commit()
 
-    async def get_by_id(self, query_id: int) -> Optional[Query]:
-        db = await self._session.get(QueryORM, query_id)
-        if not db:
-            return None
-        return Query(
+    async def claim_run(self, query_id: int, previous_run_at, timestamp) -> bool:
+        res = await self._session.execute(
+            update(QueryORM)
+            .where(QueryORM.id == query_id, QueryORM.last_run_at.is_not_distinct_from(previous_run_at))
+            .values(last_run_at=timestamp)
+        )
+        await self._commit()
+        return res.rowcount > 0
+
+    async def delete(self, query_id: int) -> bool:
+        res = await self._session.execute(delete(QueryORM).where(QueryORM.id == query_id))
+        await self._commit()
+        return res.rowcount > 0
+
+
+class SqlAlchemyQueryRunRepository(_SqlAlchemyRepository, QueryRunRepositoryPort):
+    async def save(self, run: QueryRun) -> QueryRun:
+        db = QueryRunORM(
+            query_id=run.query_id,
+            started_at=run.started_at,
+            finished_at=run.finished_at,
+            status=run.status,
+            found=run.found,
+            saved=run.saved,
+            error=run.error,
+        )
+        self._session.add(db)
+        await self._commit()
+        return QueryRun(
             id=db.id,
-            name=db.name,
-            search_text=db.search_text,
-            filters=db.filters,
-            schedule_interval=db.schedule_interval,
-            is_active=db.is_active,
-            created_at=db.created_at,
-            last_run_at=db.last_run_at,
+            query_id=db.query_id,
+            started_at=db.started_at,
+            finished_at=db.finished_at,
+            status=db.status,
+            found=db.found,
+            saved=db.saved,
+            error=db.error,
         )
 
-    async def list_active(self) -> list[Query]:
-        rows = (await self._session.execute(select(QueryORM).where(QueryORM.is_active == True))).scalars().all()
+    async def list_by_query(self, query_id: int, limit: int = 20) -> list[QueryRun]:
+        rows = (await self._session.execute(
+            select(QueryRunORM).where(QueryRunORM.query_id == query_id).order_by(QueryRunORM.started_at.desc()).limit(limit)
+        )).scalars().all()
         return [
-            Query(
+            QueryRun(
                 id=r.id,
-                name=r.name,
-                search_text=r.search_text,
-                filters=r.filters,
-                schedule_interval=r.schedule_interval,
-                is_active=r.is_active,
-                created_at=r.created_at,
-                last_run_at=r.last_run_at,
+                query_id=r.query_id,
+                started_at=r.started_at,
+                finished_at=r.finished_at,
+                status=r.status,
+                found=r.found,
+                saved=r.saved,
+                error=r.error,
             )
             for r in rows
         ]
 
-    async def update_last_run(self, query_id: int, timestamp) -> None:
-        await self._session.execute(
-            update(QueryORM).where(QueryORM.id == query_id).values(last_run_at=timestamp)
+
+class SqlAlchemyScrapeJobRepository(_SqlAlchemyRepository, ScrapeJobRepositoryPort):
+    @staticmethod
+    def _to_entity(db: ScrapeJobORM) -> ScrapeJob:
+        return ScrapeJob(
+            id=db.id,
+            query_id=db.query_id,
+            params=db.params,
+            status=db.status,
+            progress=db.progress,
+            result=db.result,
+            error=db.error,
+            attempts=db.attempts,
+            created_at=db.created_at,
+            started_at=db.started_at,
+            finished_at=db.finished_at,
         )
-        await self._session.commit()
 
-    async def delete(self, query_id: int) -> bool:
-        res = await self._session.execute(delete(QueryORM).where(QueryORM.id == query_id))
-        await self._session.commit()
-        return res.rowcount > 0
+    async def create(self, job: ScrapeJob) -> ScrapeJob:
+        db = ScrapeJobORM(
+            id=job.id or uuid.uuid4().hex,
+            query_id=job.query_id,
+            params=job.params,
+            status="queued",
+            created_at=datetime.now(timezone.utc),
+        )
+        self._session.add(db)
+        await self._commit()
+        return self._to_entity(db)
 
+    async def get_by_id(self, job_id: str) -> Optional[ScrapeJob]:
+        db = await self._session.get(ScrapeJobORM, job_id, populate_existing=True)
+        if not db:
+            return None
+        return self._to_entity(db)
 
-class SqlAlchemyTwitterUserRepository(TwitterUserRepositoryPort):
-    def __init__(self, session: AsyncSession):
-        self._session = session
+    async def claim_next(self) -> Optional[ScrapeJob]:
+        # SKIP LOCKED lets every worker of every process poll the same queue safely
+        next_id = (
+            select(ScrapeJobORM.id)
+            .where(ScrapeJobORM.status == "queued")
+            .order_by(ScrapeJobORM.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        now = datetime.now(timezone.utc)
+        db = (await self._session.execute(
+            update(ScrapeJobORM)
+            .where(ScrapeJobORM.id == next_id)
+            .values(status="running", started_at=now, heartbeat_at=now, attempts=ScrapeJobORM.attempts + 1)
+            .returning(ScrapeJobORM)
+            .execution_options(synchronize_session=False)
+        )).scalar_one_or_none()
+        await self._commit()
+        if not db:
+            return None
+        return self._to_entity(db)
+
+    async def heartbeat(self, job_id: str, progress: Optional[dict] = None) -> None:
+        values: dict = {"heartbeat_at": datetime.now(timezone.utc)}
+        if progress is not None:
+            values["progress"] = progress
+        await self._session.execute(update(ScrapeJobORM).where(ScrapeJobORM.id == job_id).values(**values))
+        await self._commit()
+
+    async def finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        await self._session.execute(
+            update(ScrapeJobORM)
+            .where(ScrapeJobORM.id == job_id)
+            .values(status=status, result=result, error=error, finished_at=datetime.now(timezone.utc))
+        )
+        await self._commit()
 
+    async def requeue_stale(self, older_than: datetime) -> int:
+        res = await self._session.execute(
+            update(ScrapeJobORM)
+            .where(ScrapeJobORM.status == "running", ScrapeJobORM.heartbeat_at < older_than)
+            .values(status="queued")
+        )
+        await self._commit()
+        return res.rowcount
+
+
+class SqlAlchemyTwitterUserRepository(_SqlAlchemyRepository, TwitterUserRepositoryPort):
     async def save(self, user: TwitterUser) -> TwitterUser:
         existing = await self._session.get(UserORM, user.user_id)
         if existing:
@@ -171,214 +322,712 @@ class SqlAlchemyTwitterUserRepository(TwitterUserRepositoryPort):
                 location=user.location,
                 auto_update=user.auto_update,
             ))
-        await self._session.commit()
-        db = await self._session.get(UserORM, user.user_id)
-        return TwitterUser(
-            user_id=db.user_id,
-            username=db.username,
-            display_name=db.display_name,
-            bio=db.bio,
-            followers_count=db.followers_count,
-            following_count=db.following_count,
-            profile_image_url=db.profile_image_url,
-            header_image_url=db.header_image_url,
-            location=db.location,
-            auto_update=db.auto_update,
-            created_at=db.created_at,
-            updated_at=db.updated_at,
-        )
+        await self._commit()
+        return await self.get_by_id(user.user_id)
+
+    async def save_many(self, users: list[TwitterUser]) -> list[TwitterUser]:
+        """Upsert profiles with one INSERT ... ON CONFLICT (user_id) DO UPDATE per chunk.
+
+        ``created_at`` and the user-controlled ``auto_update`` flag of existing rows
+        are preserved; ``updated_at`` is bumped to the transaction time.
+        """
+        if not users:
+            return []
+        unique = list({u.user_id: u for u in users}.values())
+        now = datetime.now(timezone.utc)
+        saved: list[TwitterUser] = []
+        for chunk in _chunks(unique):
+            stmt = pg_insert(UserORM).values([
+                dict(
+                    user_id=u.user_id,
+                    username=u.username,
+                    display_name=u.display_name,
+                    bio=u.bio,
+                    followers_count=u.followers_count,
+                    following_count=u.following_count,
+                    profile_image_url=u.profile_image_url,
+                    header_image_url=u.header_image_url,
+                    location=u.location,
+                    auto_update=u.auto_update,
+                    created_at=now,
+                    updated_at=now,
+                )
+                for u in chunk
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserORM.user_id],
+                set_={
+                    "username": stmt.excluded.username,
+                    "display_name": stmt.excluded.display_name,
+                    "bio": stmt.excluded.bio,
+                    "followers_count": stmt.excluded.followers_count,
+                    "following_count": stmt.excluded.following_count,
+                    "profile_image_url": stmt.excluded.profile_image_url,
+                    "header_image_url": stmt.excluded.header_image_url,
+                    "location": stmt.excluded.location,
+                    "updated_at": func.now(),
+                },
+            ).returning(*USER_ROWS.columns)
+            saved.extend(USER_ROWS.all((await self._session.execute(stmt)).all()))
+        await self._commit()
+        return saved
 
     async def get_by_id(self, user_id: str) -> Optional[TwitterUser]:
-        db = await self._session.get(UserORM, user_id)
-        if not db:
-            return None
-        return TwitterUser(
-            user_id=db.user_id,
-            username=db.username,
-            display_name=db.display_name,
-            bio=db.bio,
-            followers_count=db.followers_count,
-            following_count=db.following_count,
-            profile_image_url=db.profile_image_url,
-            header_image_url=db.header_image_url,
-            location=db.location,
-            auto_update=db.auto_update,
-            created_at=db.created_at,
-            updated_at=db.updated_at,
-        )
+        row = (await self._session.execute(USER_ROWS.select().where(UserORM.user_id == user_id))).first()
+        return USER_ROWS.one(row)
 
     async def get_by_username(self, username: str) -> Optional[TwitterUser]:
-        row = (await self._session.execute(select(UserORM).where(UserORM.username == username))).scalar_one_or_none()
-        if not row:
-            return None
-        return TwitterUser(
-            user_id=row.user_id,
-            username=row.username,
-            display_name=row.display_name,
-            bio=row.bio,
-            followers_count=row.followers_count,
-            following_count=row.following_count,
-            profile_image_url=row.profile_image_url,
-            header_image_url=row.header_image_url,
-            location=row.location,
-            auto_update=row.auto_update,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-        )
+        row = (await self._session.execute(USER_ROWS.select().where(UserORM.username == username))).first()
+        return USER_ROWS.one(row)
 
     async def list_for_auto_update(self) -> list[TwitterUser]:
-        rows = (await self._session.execute(select(UserORM).where(UserORM.auto_update == True))).scalars().all()
-        return [
-            TwitterUser(
-                user_id=r.user_id,
-                username=r.username,
-                display_name=r.display_name,
-                bio=r.bio,
-                followers_count=r.followers_count,
-                following_count=r.following_count,
-                profile_image_url=r.profile_image_url,
-                header_image_url=r.header_image_url,
-                location=r.location,
-                auto_update=r.auto_update,
-                created_at=r.created_at,
-                updated_at=r.updated_at,
-            )
-            for r in rows
-        ]
+        rows = (await self._session.execute(USER_ROWS.select().where(UserORM.auto_update == True))).all()
+        return USER_ROWS.all(rows)
+
+    async def get_updated_since(self, user_ids: list[str], since) -> dict[str, datetime]:
+        if not user_ids:
+            return {}
+        rows = (await self._session.execute(
+            select(UserORM.user_id, UserORM.updated_at)
+            .where(UserORM.user_id.in_(user_ids), UserORM.updated_at >= since)
+        )).all()
+        return {r.user_id: r.updated_at for r in rows}
 
     async def update_profile(self, user: TwitterUser) -> TwitterUser:
         return await self.save(user)
 
 
-class SqlAlchemyTweetRepository(TweetRepositoryPort):
-    def __init__(self, session: AsyncSession):
-        self._session = session
+class SqlAlchemyTweetRepository(_SqlAlchemyRepository, TweetRepositoryPort):
+    @staticmethod
+    def _values(t: Tweet) -> dict:
+        return dict(
+            tweet_id=t.tweet_id,
+            text=t.text,
+            author_id=t.author_id,
+            created_at=t.created_at,
+            retweet_count=t.retweet_count,
+            like_count=t.like_count,
+            reply_count=t.reply_count,
+            quote_count=t.quote_count,
+            tweet_type=t.tweet_type,
+            hashtags=t.hashtags,
+            mentions=t.mentions,
+            media_urls=t.media_urls,
+            query_id=t.query_id,
+            source=t.source,
+            original_url=t.original_url,
+            scraped_at=t.scraped_at or datetime.now(timezone.utc),
+        )
+
+    # Engagement columns an upsert refreshes, in TweetDelta order
+    _METRICS = ("like_count", "retweet_count", "reply_count", "quote_count")
+
+    @staticmethod
+    def _unique(tweets: list[Tweet]) -> list[Tweet]:
+        # ON CONFLICT cannot touch the same row twice in one statement; last sighting wins.
+        # Sorted so concurrent executions lock shared rows in the same order (no deadlocks).
+        return sorted({t.tweet_id: t for t in tweets}.values(), key=lambda t: t.tweet_id)
+
+    def needs_storage_for(self, tweets: list[Tweet]) -> bool:
+        return bool(missing_months(t.created_at for t in tweets))
+
+    async def create_storage_for(self, tweets: list[Tweet]) -> None:
+        await ensure_partitions_for(self._session.bind, (t.created_at for t in tweets))
+
+    async def _prepare_partitions(self, tweets: list[Tweet]) -> None:
+        if not self.needs_storage_for(tweets):
+            return
+        if self._autocommit:
+            # The partition DDL would otherwise wait on this session's own transaction
+            await self._session.commit()
+        await self.create_storage_for(tweets)
 
     async def save_many(self, tweets: list[Tweet]) -> int:
+        """Insert tweets that are not stored yet; existing rows are left untouched"""
         if not tweets:
             return 0
-        ids = [t.tweet_id for t in tweets]
-        existing = set((await self._session.execute(
-            select(TweetORM.tweet_id).where(TweetORM.tweet_id.in_(ids))
-        )).scalars().all())
-        to_insert = [t for t in tweets if t.tweet_id not in existing]
-        for t in to_insert:
-            self._session.add(TweetORM(
-                tweet_id=t.tweet_id,
-                text=t.text,
-                author_id=t.author_id,
-                created_at=t.created_at,
-                retweet_count=t.retweet_count,
-                like_count=t.like_count,
-                reply_count=t.reply_count,
-                quote_count=t.quote_count,
-                tweet_type=t.tweet_type,
-                hashtags=t.hashtags,
-                mentions=t.mentions,
-                media_urls=t.media_urls,
-                query_id=t.query_id,
-                source=t.source,
-                original_url=t.original_url,
-                scraped_at=t.scraped_at,
-            ))
-        await self._session.commit()
-        return len(to_insert)
+        saved = 0
+        await self._prepare_partitions(tweets)
+        for chunk in _chunks(self._unique(tweets)):
+            stmt = (
+                pg_insert(TweetORM)
+                .values([self._values(t) for t in chunk])
+                .on_conflict_do_nothing(index_elements=[TweetORM.tweet_id, TweetORM.created_at])
+                .returning(TweetORM.tweet_id)
+            )
+            saved += len((await self._session.execute(stmt)).scalars().all())
+        await self._commit()
+        return saved
+
+    async def upsert_many(self, tweets: list[Tweet]) -> UpsertResult:
+        """Insert new tweets and refresh engagement metrics + scraped_at of known ones.
+
+        Per chunk, an INSERT ... ON CONFLICT DO NOTHING returns exactly the rows it
+        inserted (it waits for concurrent inserts of the same tweets). The rest are
+        locked and read before one UPDATE ... FROM VALUES, so the returned deltas are
+        the true changes even when executions share tweets (``RETURNING`` cannot show
+        old values before PostgreSQL 18, nor ``xmax`` of a partitioned table).
+        """
+        if not tweets:
+            return UpsertResult()
+        t = TweetORM
+        inserted = updated = 0
+        deltas: list[TweetDelta] = []
+        await self._prepare_partitions(tweets)
+        for chunk in _chunks(self._unique(tweets)):
+            new_ids = set((await self._session.execute(
+                pg_insert(t)
+                .values([self._values(tw) for tw in chunk])
+                .on_conflict_do_nothing(index_elements=[t.tweet_id, t.created_at])
+                .returning(t.tweet_id)
+            )).scalars())
+            inserted += len(new_ids)
+            deltas.extend(
+                TweetDelta(
+                    author_id=tw.author_id,
+                    query_id=tw.query_id,
+                    created_at=tw.created_at,
+                    tweets=1,
+                    likes=tw.like_count,
+                    retweets=tw.retweet_count,
+                    replies=tw.reply_count,
+                    quotes=tw.quote_count,
+                )
+                for tw in chunk if tw.tweet_id in new_ids
+            )
+            seen = [tw for tw in chunk if tw.tweet_id not in new_ids]
+            if not seen:
+                continue
+            stored = {
+                r.tweet_id: r
+                for r in (await self._session.execute(
+                    select(t.tweet_id, t.author_id, t.query_id, t.created_at, *(getattr(t, m) for m in self._METRICS))
+                    .where(tuple_(t.tweet_id, t.created_at).in_([(tw.tweet_id, tw.created_at) for tw in seen]))
+                    .order_by(t.tweet_id)
+                    .with_for_update()
+                )).all()
+            }
+            incoming = values(
+                column("tweet_id", String),
+                column("created_at", DateTime(timezone=True)),
+                *(column(m, BigInteger) for m in self._METRICS),
+                column("scraped_at", DateTime(timezone=True)),
+                name="incoming",
+            ).data([
+                (
+                    tw.tweet_id, tw.created_at, *(getattr(tw, m) for m in self._METRICS),
+                    tw.scraped_at or datetime.now(timezone.utc),
+                )
+                for tw in seen
+            ])
+            await self._session.execute(
+                update(t)
+                .where(t.tweet_id == incoming.c.tweet_id, t.created_at == incoming.c.created_at)
+                .values(scraped_at=incoming.c.scraped_at, **{m: incoming.c[m] for m in self._METRICS})
+            )
+            updated += len(stored)
+            for tw in seen:
+                old = stored.get(tw.tweet_id)
+                change = old and [getattr(tw, m) - getattr(old, m) for m in self._METRICS]
+                if change and any(change):
+                    deltas.append(TweetDelta(old.author_id, old.query_id, old.created_at, 0, *change))
+        await self._commit()
+        return UpsertResult(inserted=inserted, updated=updated, deltas=tuple(deltas))
 
     async def get_by_id(self, tweet_id: str) -> Optional[Tweet]:
-        db = await self._session.get(TweetORM, tweet_id)
-        if not db:
-            return None
-        return Tweet(
-            tweet_id=db.tweet_id,
-            text=db.text,
-            author_id=db.author_id,
-            created_at=db.created_at,
-            retweet_count=db.retweet_count,
-            like_count=db.like_count,
-            reply_count=db.reply_count,
-            quote_count=db.quote_count,
-            tweet_type=db.tweet_type,
-            hashtags=db.hashtags,
-            mentions=db.mentions,
-            media_urls=db.media_urls,
-            query_id=db.query_id,
-            source=db.source,
-            original_url=db.original_url,
-            scraped_at=db.scraped_at,
-        )
+        # The primary key is (tweet_id, created_at); tweet_id alone is still unique in practice
+        row = (await self._session.execute(
+            TWEET_ROWS.select().where(TweetORM.tweet_id == tweet_id).limit(1)
+        )).first()
+        return TWEET_ROWS.one(row)
 
     async def list_by_query(self, query_id: int, limit: int = 100) -> list[Tweet]:
         rows = (await self._session.execute(
-            select(TweetORM).where(TweetORM.query_id == query_id).order_by(TweetORM.created_at.desc()).limit(limit)
+            TWEET_ROWS.select().where(TweetORM.query_id == query_id).order_by(TweetORM.created_at.desc()).limit(limit)
+        )).all()
+        return TWEET_ROWS.all(rows)
+
+    async def list_recent(self, limit: int = 50) -> list[Tweet]:
+        rows = (await self._session.execute(
+            TWEET_ROWS.select().order_by(TweetORM.created_at.desc()).limit(limit)
+        )).all()
+        return TWEET_ROWS.all(rows)
+
+    async def list_page(
+        self,
+        query_id: Optional[int] = None,
+        author_id: Optional[str] = None,
+        tweet_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        hashtag: Optional[str] = None,
+        mention: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> TweetPage:
+        q = TWEET_ROWS.select()
+        if query_id is not None:
+            q = q.where(TweetORM.query_id == query_id)
+        if author_id is not None:
+            q = q.where(TweetORM.author_id == author_id)
+        if tweet_type is not None:
+            q = q.where(TweetORM.tweet_type == tweet_type)
+        if since is not None:
+            q = q.where(TweetORM.created_at >= since)
+        if until is not None:
+            q = q.where(TweetORM.created_at < until)
+        if hashtag:
+            q = q.where(TweetORM.hashtags.contains([_normalize_tag(hashtag)]))
+        if mention:
+            q = q.where(TweetORM.mentions.contains([_normalize_tag(mention)]))
+        if cursor:
+            try:
+                created_at, tweet_id = _decode_cursor(cursor)
+                created_at = datetime.fromisoformat(created_at)
+            except (TypeError, ValueError) as e:
+                raise ValueError("Invalid cursor") from e
+            # Row comparison seeks straight into the (…, created_at DESC, tweet_id DESC) indexes
+            q = q.where(tuple_(TweetORM.created_at, TweetORM.tweet_id) < tuple_(created_at, tweet_id))
+        q = q.order_by(TweetORM.created_at.desc(), TweetORM.tweet_id.desc()).limit(limit + 1)
+        rows = (await self._session.execute(q)).all()
+        items = TWEET_ROWS.all(rows[:limit])
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = _encode_cursor(last.created_at, last.tweet_id)
+        return TweetPage(items=items, next_cursor=next_cursor)
+
+    @staticmethod
+    def _tsquery(text: str, mode: str):
+        if mode == "phrase":
+            return func.phraseto_tsquery(_TS_CONFIG, text)
+        if mode == "prefix":
+            # Every word must match as a prefix: "data sci" -> data:* & sci:*
+            words = _WORD_RE.findall(text)
+            if not words:
+                raise ValueError("Search text has no words")
+            return func.to_tsquery(_TS_CONFIG, " & ".join(f"{w}:*" for w in words))
+        if mode == "web":
+            return func.websearch_to_tsquery(_TS_CONFIG, text)
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    async def search_text(
+        self,
+        text: str,
+        mode: str = "web",
+        query_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        order: str = "rank",
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> TweetPage:
+        if not text.strip():
+            raise ValueError("Search text is empty")
+        tsquery = self._tsquery(text, mode)
+        rank = func.ts_rank(TweetORM.search_vector, tsquery)
+        if order == "rank":
+            key = (rank, TweetORM.created_at, TweetORM.tweet_id)
+        elif order == "recent":
+            key = (TweetORM.created_at, TweetORM.tweet_id)
+        else:
+            raise ValueError(f"Unknown search order: {order}")
+
+        q = TWEET_ROWS.select(rank).where(TweetORM.search_vector.op("@@")(tsquery))
+        if query_id is not None:
+            q = q.where(TweetORM.query_id == query_id)
+        if since is not None:
+            q = q.where(TweetORM.created_at >= since)
+        if until is not None:
+            q = q.where(TweetORM.created_at < until)
+        if cursor:
+            values = _decode_cursor(cursor)
+            if not isinstance(values, list) or len(values) != len(key):
+                raise ValueError("Invalid cursor")
+            try:
+                values[-2] = datetime.fromisoformat(values[-2])
+            except (TypeError, ValueError) as e:
+                raise ValueError("Invalid cursor") from e
+            q = q.where(tuple_(*key) < tuple_(*values))
+        q = q.order_by(*(k.desc() for k in key)).limit(limit + 1)
+        rows = (await self._session.execute(q)).all()
+
+        items = [TWEET_ROWS.one(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last, last_rank = items[-1], rows[limit - 1][-1]
+            head = (last_rank,) if order == "rank" else ()
+            next_cursor = _encode_cursor(*head, last.created_at, last.tweet_id)
+        return TweetPage(items=items, next_cursor=next_cursor)
+
+    async def top_hashtags(self, query_id: int, limit: int = 20, since: Optional[datetime] = None) -> list[HashtagCount]:
+        # jsonb_typeof also skips JSON null values stored before the columns used none_as_null
+        tags = func.jsonb_array_elements_text(TweetORM.hashtags).table_valued("value").lateral("tag")
+        q = (
+            select(func.lower(tags.c.value).label("hashtag"), func.count().label("n"))
+            .select_from(TweetORM)
+            .join(tags, true())
+            .where(TweetORM.query_id == query_id, func.jsonb_typeof(TweetORM.hashtags) == "array")
+            .group_by(literal_column("hashtag"))
+            .order_by(literal_column("n").desc(), literal_column("hashtag"))
+            .limit(limit)
+        )
+        if since is not None:
+            q = q.where(TweetORM.created_at >= since)
+        rows = (await self._session.execute(q)).all()
+        return [HashtagCount(hashtag=h, count=n) for h, n in rows]
+
+    async def hashtag_cooccurrence(
+        self, query_id: int, hashtag: Optional[str] = None, limit: int = 20, since: Optional[datetime] = None
+    ) -> list[HashtagPair]:
+        # Two unnestings of the same array give every tag pair within a tweet
+        a = func.jsonb_array_elements_text(TweetORM.hashtags).table_valued("value").lateral("a")
+        b = func.jsonb_array_elements_text(TweetORM.hashtags).table_valued("value").lateral("b")
+        first, second = func.lower(a.c.value), func.lower(b.c.value)
+        q = (
+            select(first.label("hashtag"), second.label("other"), func.count().label("n"))
+            .select_from(TweetORM)
+            .join(a, true())
+            .join(b, true())
+            .where(TweetORM.query_id == query_id, func.jsonb_typeof(TweetORM.hashtags) == "array")
+        )
+        if hashtag:
+            tag = _normalize_tag(hashtag)
+            q = q.where(TweetORM.hashtags.contains([tag]), first == tag, second != tag)
+        else:
+            q = q.where(first < second)
+        if since is not None:
+            q = q.where(TweetORM.created_at >= since)
+        q = (
+            q.group_by(literal_column("hashtag"), literal_column("other"))
+            .order_by(literal_column("n").desc(), literal_column("hashtag"), literal_column("other"))
+            .limit(limit)
+        )
+        rows = (await self._session.execute(q)).all()
+        return [HashtagPair(hashtag=h, other=o, count=n) for h, o, n in rows]
+
+    async def iter_by_query(self, query_id: int, batch_size: int = 1000) -> AsyncIterator[list[Tweet]]:
+        # Plain columns rather than ORM objects: nothing accumulates in the identity map
+        result = await self._session.stream(
+            TWEET_ROWS.select()
+            .where(TweetORM.query_id == query_id)
+            .order_by(TweetORM.created_at, TweetORM.tweet_id)
+            .execution_options(yield_per=batch_size)
+        )
+        try:
+            async for rows in result.partitions():
+                yield TWEET_ROWS.all(rows)
+        finally:
+            await result.close()
+
+    async def get_duplicates(self, tweet_ids: list[str]) -> set[str]:
+        rows = (await self._session.execute(
+            select(TweetORM.tweet_id).where(TweetORM.tweet_id.in_(tweet_ids))
         )).scalars().all()
+        return set(rows)
+
+
+class SqlAlchemyTweetMetricSnapshotRepository(_SqlAlchemyRepository, TweetMetricSnapshotRepositoryPort):
+    _METRICS = ("like_count", "retweet_count", "reply_count", "quote_count")
+
+    async def record(self, tweets: list[Tweet], observed_at: Optional[datetime] = None) -> int:
+        observed_at = observed_at or datetime.now(timezone.utc)
+        latest_by_id = {t.tweet_id: t for t in tweets}
+        s = TweetMetricSnapshotORM
+        recorded = 0
+        for chunk in _chunks(list(latest_by_id.values())):
+            observed = values(
+                column("tweet_id", String),
+                column("observed_at", DateTime(timezone=True)),
+                *(column(m, Integer) for m in self._METRICS),
+                name="observed",
+            ).data([
+                (t.tweet_id, observed_at, t.like_count, t.retweet_count, t.reply_count, t.quote_count)
+                for t in chunk
+            ])
+            # Latest stored snapshot per tweet, found through the (tweet_id, observed_at) primary key
+            latest = (
+                select(*(getattr(s, m) for m in self._METRICS))
+                .where(s.tweet_id == observed.c.tweet_id)
+                .order_by(s.observed_at.desc())
+                .limit(1)
+                .lateral("latest")
+            )
+            changed = (
+                select(observed)
+                .outerjoin(latest, literal_column("true"))
+                .where(
+                    tuple_(*(latest.c[m] for m in self._METRICS)).is_distinct_from(
+                        tuple_(*(observed.c[m] for m in self._METRICS))
+                    )
+                )
+            )
+            stmt = (
+                pg_insert(s)
+                .from_select(["tweet_id", "observed_at", *self._METRICS], changed)
+                .on_conflict_do_nothing()
+            )
+            recorded += (await self._session.execute(stmt)).rowcount
+        await self._commit()
+        return recorded
+
+    async def curve(self, tweet_id: str, since: Optional[datetime] = None, limit: int = 1000) -> list[MetricSnapshot]:
+        s = TweetMetricSnapshotORM
+        q = select(s).where(s.tweet_id == tweet_id)
+        if since is not None:
+            q = q.where(s.observed_at >= since)
+        rows = (await self._session.execute(q.order_by(s.observed_at).limit(limit))).scalars().all()
         return [
-            Tweet(
+            MetricSnapshot(
                 tweet_id=r.tweet_id,
-                text=r.text,
-                author_id=r.author_id,
-                created_at=r.created_at,
-                retweet_count=r.retweet_count,
+                observed_at=r.observed_at,
                 like_count=r.like_count,
+                retweet_count=r.retweet_count,
                 reply_count=r.reply_count,
                 quote_count=r.quote_count,
-                tweet_type=r.tweet_type,
-                hashtags=r.hashtags,
-                mentions=r.mentions,
-                media_urls=r.media_urls,
-                query_id=r.query_id,
-                source=r.source,
-                original_url=r.original_url,
-                scraped_at=r.scraped_at,
             )
             for r in rows
         ]
 
-    async def list_recent(self, limit: int = 50) -> list[Tweet]:
-        rows = (await self._session.execute(
-            select(TweetORM).order_by(TweetORM.created_at.desc()).limit(limit)
-        )).scalars().all()
+    async def fastest_growing(self, query_id: int, since: datetime, limit: int = 20) -> list[TweetGrowth]:
+        s = TweetMetricSnapshotORM
+        total = s.like_count + s.retweet_count + s.reply_count + s.quote_count
+
+        def delta(expr):
+            # last value minus first value inside the window
+            last = func.array_agg(aggregate_order_by(expr, s.observed_at.desc()))[1]
+            first = func.array_agg(aggregate_order_by(expr, s.observed_at))[1]
+            return last - first
+
+        engagement = delta(total).label("engagement_delta")
+        q = (
+            select(
+                s.tweet_id,
+                engagement,
+                delta(s.like_count),
+                delta(s.retweet_count),
+                func.min(s.observed_at),
+                func.max(s.observed_at),
+                func.count(),
+            )
+            .join(TweetORM, TweetORM.tweet_id == s.tweet_id)
+            .where(TweetORM.query_id == query_id, s.observed_at >= since)
+            .group_by(s.tweet_id)
+            .having(func.count() > 1)
+            .order_by(engagement.desc(), s.tweet_id)
+            .limit(limit)
+        )
+        rows = (await self._session.execute(q)).all()
         return [
-            Tweet(
-                tweet_id=r.tweet_id,
-                text=r.text,
-                author_id=r.author_id,
-                created_at=r.created_at,
-                retweet_count=r.retweet_count,
-                like_count=r.like_count,
-                reply_count=r.reply_count,
-                quote_count=r.quote_count,
-                tweet_type=r.tweet_type,
-                hashtags=r.hashtags,
-                mentions=r.mentions,
-                media_urls=r.media_urls,
+            TweetGrowth(
+                tweet_id=tid,
+                engagement_delta=eng,
+                like_delta=likes,
+                retweet_delta=retweets,
+                first_observed_at=first,
+                last_observed_at=last,
+                observations=n,
+            )
+            for tid, eng, likes, retweets, first, last, n in rows
+        ]
+
+
+class SqlAlchemyStatsRepository(_SqlAlchemyRepository, StatsRepositoryPort):
+    """Rollups are running totals that ingest adds its upsert deltas to.
+
+    Applying a batch is one INSERT ... ON CONFLICT DO UPDATE per table that adds the
+    summed deltas, so its cost does not grow with an author's history, and totals
+    outlive tweet partitions dropped by retention. ``backfill`` recomputes them from
+    the stored tweets instead.
+    """
+
+    _TOTALS = ("tweets", "likes", "retweets", "replies", "quotes")
+
+    @staticmethod
+    def _aggregates():
+        t = TweetORM
+        return (
+            func.count(),
+            func.sum(t.like_count),
+            func.sum(t.retweet_count),
+            func.sum(t.reply_count),
+            func.sum(t.quote_count),
+        )
+
+    @staticmethod
+    def _upsert_hourly(rows):
+        s = QueryHourlyStatsORM
+        stmt = pg_insert(s).from_select(
+            ["query_id", "bucket", "tweets", "likes", "retweets", "replies", "quotes"], rows
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[s.query_id, s.bucket],
+            set_={c: stmt.excluded[c] for c in ("tweets", "likes", "retweets", "replies", "quotes")},
+        )
+
+    @classmethod
+    def _upsert_authors(cls, where):
+        t, s = TweetORM, AuthorStatsORM
+        rows = (
+            select(t.author_id, *cls._aggregates(), func.min(t.created_at), func.max(t.created_at), func.now())
+            .where(where)
+            .group_by(t.author_id)
+            .order_by(t.author_id)  # consistent lock order across concurrent executions
+        )
+        stmt = pg_insert(s).from_select(
+            ["author_id", "tweets", "likes", "retweets", "replies", "quotes", "first_tweet_at", "last_tweet_at", "updated_at"],
+            rows,
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[s.author_id],
+            set_={
+                c: stmt.excluded[c]
+                for c in ("tweets", "likes", "retweets", "replies", "quotes", "first_tweet_at", "last_tweet_at", "updated_at")
+            },
+        )
+
+    @classmethod
+    def _summed(cls, deltas: list[TweetDelta], key: Callable[[TweetDelta], Any]) -> list[tuple[Any, dict]]:
+        """Deltas summed per ``key`` (None skips a delta), in key order"""
+        totals: dict = {}
+        for d in deltas:
+            k = key(d)
+            if k is None:
+                continue
+            row = totals.get(k)
+            if row is None:
+                row = totals[k] = {
+                    "tweets": 0, "likes": 0, "retweets": 0, "replies": 0, "quotes": 0,
+                    "first_tweet_at": d.created_at, "last_tweet_at": d.created_at,
+                }
+            for c in cls._TOTALS:
+                row[c] += getattr(d, c)
+            row["first_tweet_at"] = min(row["first_tweet_at"], d.created_at)
+            row["last_tweet_at"] = max(row["last_tweet_at"], d.created_at)
+        # Sorted so concurrent executions lock shared rollup rows in the same order
+        return [(k, totals[k]) for k in sorted(totals)]
+
+    async def apply(self, deltas: list[TweetDelta]) -> None:
+        def hour(d: TweetDelta) -> Optional[tuple[int, datetime]]:
+            if d.query_id is None:
+                return None
+            return d.query_id, d.created_at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+        hourly = [
+            {"query_id": query_id, "bucket": bucket, **{c: row[c] for c in self._TOTALS}}
+            for (query_id, bucket), row in self._summed(deltas, hour)
+        ]
+        authors = [
+            {"author_id": author_id, **row, "updated_at": func.now()}
+            for author_id, row in self._summed(deltas, lambda d: d.author_id)
+        ]
+        s = QueryHourlyStatsORM
+        for chunk in _chunks(hourly):
+            stmt = pg_insert(s).values(chunk)
+            await self._session.execute(stmt.on_conflict_do_update(
+                index_elements=[s.query_id, s.bucket],
+                set_={c: getattr(s, c) + stmt.excluded[c] for c in self._TOTALS},
+            ))
+        a = AuthorStatsORM
+        for chunk in _chunks(authors):
+            stmt = pg_insert(a).values(chunk)
+            await self._session.execute(stmt.on_conflict_do_update(
+                index_elements=[a.author_id],
+                set_={
+                    **{c: getattr(a, c) + stmt.excluded[c] for c in self._TOTALS},
+                    "first_tweet_at": func.least(a.first_tweet_at, stmt.excluded.first_tweet_at),
+                    "last_tweet_at": func.greatest(a.last_tweet_at, stmt.excluded.last_tweet_at),
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ))
+        await self._commit()
+
+    async def backfill(self, query_id: Optional[int] = None) -> int:
+        t, s = TweetORM, QueryHourlyStatsORM
+        bucket = func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", t.created_at)))
+        rows = select(t.query_id, bucket, *self._aggregates()).where(t.query_id.is_not(None))
+        clear = delete(s)
+        if query_id is not None:
+            rows = rows.where(t.query_id == query_id)
+            clear = clear.where(s.query_id == query_id)
+        await self._session.execute(clear)
+        written = (await self._session.execute(self._upsert_hourly(rows.group_by(t.query_id, bucket)))).rowcount
+
+        if query_id is None:
+            await self._session.execute(delete(AuthorStatsORM))
+            authors = t.author_id.is_not(None)
+        else:
+            authors = t.author_id.in_(select(t.author_id).where(t.query_id == query_id).distinct())
+        written += (await self._session.execute(self._upsert_authors(authors))).rowcount
+        await self._commit()
+        return written
+
+    async def query_hourly(
+        self, query_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> list[QueryHourlyStats]:
+        s = QueryHourlyStatsORM
+        q = select(s).where(s.query_id == query_id)
+        if since is not None:
+            q = q.where(s.bucket >= since)
+        if until is not None:
+            q = q.where(s.bucket < until)
+        rows = (await self._session.execute(q.order_by(s.bucket))).scalars().all()
+        return [
+            QueryHourlyStats(
                 query_id=r.query_id,
-                source=r.source,
-                original_url=r.original_url,
-                scraped_at=r.scraped_at,
+                bucket=r.bucket,
+                tweets=r.tweets,
+                likes=r.likes,
+                retweets=r.retweets,
+                replies=r.replies,
+                quotes=r.quotes,
             )
             for r in rows
         ]
 
-    async def get_duplicates(self, tweet_ids: list[str]) -> set[str]:
-        rows = (await self._session.execute(
-            select(TweetORM.tweet_id).where(TweetORM.tweet_id.in_(tweet_ids))
-        )).scalars().all()
-        return set(rows)
+    async def get_author(self, author_id: str) -> Optional[AuthorStats]:
+        r = await self._session.get(AuthorStatsORM, author_id)
+        if not r:
+            return None
+        return AuthorStats(
+            author_id=r.author_id,
+            tweets=r.tweets,
+            likes=r.likes,
+            retweets=r.retweets,
+            replies=r.replies,
+            quotes=r.quotes,
+            first_tweet_at=r.first_tweet_at,
+            last_tweet_at=r.last_tweet_at,
+            updated_at=r.updated_at,
+        )
 
 
-class SqlAlchemyMediaFileRepository(MediaFileRepositoryPort):
-    def __init__(self, session: AsyncSession):
-        self._session = session
+class SqlAlchemyMediaFileRepository(_SqlAlchemyRepository, MediaFileRepositoryPort):
+    async def _tweet_created_at(self, media_files: list[MediaFile]) -> dict[str, datetime]:
+        """Partition key of each media file: its tweet's created_at"""
+        known = {m.tweet_id: m.tweet_created_at for m in media_files if m.tweet_created_at}
+        missing = {m.tweet_id for m in media_files} - known.keys()
+        if missing:
+            rows = (await self._session.execute(
+                select(TweetORM.tweet_id, TweetORM.created_at).where(TweetORM.tweet_id.in_(missing))
+            )).all()
+            known.update(rows)
+        return known
 
     async def save(self, media_file: MediaFile) -> MediaFile:
+        created_at = (await self._tweet_created_at([media_file])).get(media_file.tweet_id)
+        if created_at is None:
+            raise ValueError(f"Tweet {media_file.tweet_id} is not stored")
         db = MediaFileORM(
             tweet_id=media_file.tweet_id,
+            tweet_created_at=created_at,
             media_type=media_file.media_type,
             original_url=media_file.original_url,
             file_size=media_file.file_size,
+            sha256=media_file.sha256,
         )
         self._session.add(db)
-        await self._session.commit()
+        await self._commit()
         await self._session.refresh(db)
         return MediaFile(
             id=db.id,
@@ -387,6 +1036,8 @@ class SqlAlchemyMediaFileRepository(MediaFileRepositoryPort):
             original_url=db.original_url,
             file_size=db.file_size,
             created_at=db.created_at,
+            tweet_created_at=db.tweet_created_at,
+            sha256=db.sha256,
         )
 
     async def get_by_tweet(self, tweet_id: str) -> list[MediaFile]:
@@ -399,38 +1050,86 @@ class SqlAlchemyMediaFileRepository(MediaFileRepositoryPort):
                 original_url=r.original_url,
                 file_size=r.file_size,
                 created_at=r.created_at,
+                tweet_created_at=r.tweet_created_at,
+                sha256=r.sha256,
             )
             for r in rows
         ]
 
     async def save_many(self, media_files: list[MediaFile]) -> int:
-        for m in media_files:
-            self._session.add(MediaFileORM(
+        """Insert new media rows with INSERT ... ON CONFLICT DO NOTHING; returns how many were new"""
+        created_at = await self._tweet_created_at(media_files)
+        now = datetime.now(timezone.utc)
+        rows = {
+            # Tweets that were never stored are skipped: the row would have no partition
+            (m.tweet_id, m.original_url): dict(
                 tweet_id=m.tweet_id,
+                tweet_created_at=created_at[m.tweet_id],
                 media_type=m.media_type,
                 original_url=m.original_url,
                 file_size=m.file_size,
-            ))
-        await self._session.commit()
-        return len(media_files)
+                sha256=m.sha256,
+                created_at=now,
+            )
+            for m in media_files
+            if m.tweet_id in created_at
+        }
+        saved = 0
+        for chunk in _chunks(list(rows.values())):
+            stmt = pg_insert(MediaFileORM).values(chunk).on_conflict_do_nothing(
+                index_elements=[MediaFileORM.tweet_id, MediaFileORM.original_url, MediaFileORM.tweet_created_at]
+            ).returning(MediaFileORM.id)
+            saved += len((await self._session.execute(stmt)).all())
+        await self._commit()
+        return saved
 
+    async def get_known_urls(self, tweet_ids: list[str]) -> set[tuple[str, str]]:
+        if not tweet_ids:
+            return set()
+        rows = (await self._session.execute(
+            select(MediaFileORM.tweet_id, MediaFileORM.original_url).where(MediaFileORM.tweet_id.in_(set(tweet_ids)))
+        )).all()
+        return {(tweet_id, url) for tweet_id, url in rows}
 
-class SqlAlchemyUserRecentTweetRepository(UserRecentTweetRepositoryPort):
-    def __init__(self, session: AsyncSession):
-        self._session = session
 
+class SqlAlchemyUserRecentTweetRepository(_SqlAlchemyRepository, UserRecentTweetRepositoryPort):
     async def save_user_tweets(self, user_id: str, tweets: list[UserRecentTweet]) -> int:
-        # simple approach: delete existing, insert new
-        await self._session.execute(delete(UserRecentTweetORM).where(UserRecentTweetORM.user_id == user_id))
-        for t in tweets[:3]:
-            self._session.add(UserRecentTweetORM(
-                user_id=user_id,
-                tweet_id=t.tweet_id,
-                text=t.text,
-                created_at=t.created_at,
-            ))
-        await self._session.commit()
-        return min(3, len(tweets))
+        return await self.save_many_user_tweets({user_id: tweets})
+
+    async def save_many_user_tweets(self, tweets_by_user: dict[str, list[UserRecentTweet]]) -> int:
+        """Replace the last 3 tweets of many users, one statement per chunk of users.
+
+        The DELETE of the old rows runs as a data-modifying CTE of the INSERT, so a
+        whole execution's authors cost one round trip instead of one per author.
+        """
+        r = UserRecentTweetORM
+        now = datetime.now(timezone.utc)
+        saved = 0
+        # Up to 3 rows of 4 parameters per user
+        for users in _chunks(list(tweets_by_user), _BULK_CHUNK_SIZE // 3):
+            cleared = delete(r).where(r.user_id.in_(users))
+            rows = [(uid, t.tweet_id, t.text, t.created_at) for uid in users for t in tweets_by_user[uid][:3]]
+            if not rows:
+                await self._session.execute(cleared)
+                continue
+            incoming = values(
+                column("user_id", String),
+                column("tweet_id", String),
+                column("text", String),
+                column("created_at", DateTime(timezone=True)),
+                name="incoming",
+            ).data(rows)
+            stmt = (
+                pg_insert(r)
+                .from_select(
+                    ["user_id", "tweet_id", "text", "created_at", "updated_at"],
+                    select(incoming, literal(now, DateTime(timezone=True))),
+                )
+                .add_cte(cleared.cte("cleared"))
+            )
+            saved += (await self._session.execute(stmt)).rowcount
+        await self._commit()
+        return saved
 
     async def get_by_user(self, user_id: str) -> list[UserRecentTweet]:
         rows = (await self._session.execute(
@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...domain.ports import UnitOfWorkPort
+
+
+class SqlAlchemyUnitOfWork(UnitOfWorkPort):
+    """Transaction of one session, shared by repositories built with ``autocommit=False``"""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def commit(self) -> None:
+        await self._session.commit()
+
+    async def rollback(self) -> None:
+        await self._session.rollback()
@@ -0,0 +1,125 @@
+"""Concurrent media downloads into a local content-addressed store.
+
+Files are stored under their sha256 (``<root>/ab/cd/abcd...``), so the same
+image reached through different tweets or URLs is kept once. Downloads stream
+to a temporary file while hashing and are moved into place atomically.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional, Sequence
+
+import aiohttp
+
+from ...domain.entities import MediaFile
+from ...domain.ports import MediaDownloaderPort
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ContentAddressedStore:
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+        self._tmp = self.root / "tmp"
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def temp_file(self):
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self._tmp, delete=False)
+
+    def commit(self, temp_path: str, sha256: str) -> bool:
+        """Move a finished download into place; False if the content was already stored"""
+        target = self.path_for(sha256)
+        if target.exists():
+            os.unlink(temp_path)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, target)
+        return True
+
+
+class AiohttpMediaDownloader(MediaDownloaderPort):
+    """Downloads media over one pooled aiohttp session.
+
+    ``connections`` bounds the whole pool and ``per_host`` the connections to one
+    host (media CDNs throttle aggressive clients). Files larger than ``max_bytes``
+    are abandoned. At most ``connections`` downloads are in flight at once, so open
+    temporary files stay bounded too. A failed download is logged and left out of
+    the result; nothing is recorded for it, so a later run retries it.
+    """
+
+    def __init__(
+        self,
+        store: ContentAddressedStore,
+        connections: int = 16,
+        per_host: int = 4,
+        timeout_seconds: float = 60.0,
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self._store = store
+        self._connections = connections
+        self._per_host = per_host
+        self._timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self._max_bytes = max_bytes
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._slots = asyncio.Semaphore(connections)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily: the session must belong to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._connections, limit_per_host=self._per_host)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _fetch(self, url: str) -> tuple[str, int]:
+        digest = hashlib.sha256()
+        size = 0
+        async with self._slots, self._get_session().get(url) as resp:
+            resp.raise_for_status()
+            # Opened only once the response is known to be good
+            tmp = self._store.temp_file()
+            try:
+                with tmp:
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > self._max_bytes:
+                            raise ValueError(f"larger than {self._max_bytes} bytes")
+                        digest.update(chunk)
+                        tmp.write(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        sha256 = digest.hexdigest()
+        if not self._store.commit(tmp.name, sha256):
+            logger.debug("%s is already stored as %s", url, sha256)
+        return sha256, size
+
+    async def download_many(self, media_files: Sequence[MediaFile]) -> list[MediaFile]:
+        # The same URL is fetched once even if several tweets reference it
+        pending: dict[str, asyncio.Future] = {}
+        for m in media_files:
+            if m.original_url not in pending:
+                pending[m.original_url] = asyncio.ensure_future(self._fetch(m.original_url))
+        await asyncio.gather(*pending.values(), return_exceptions=True)
+        results: list[MediaFile] = []
+        for m in media_files:
+            task = pending[m.original_url]
+            if task.exception() is not None:
+                logger.warning("Downloading %s failed: %s", m.original_url, task.exception())
+                continue
+            sha256, size = task.result()
+            results.append(replace(m, sha256=sha256, file_size=size))
+        return results
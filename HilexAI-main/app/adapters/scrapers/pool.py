@@ -0,0 +1,178 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Sequence
+
+from ...domain.ports import ScraperPort
+from ...domain.entities import ScrapedPost, Query, Tweet, TwitterUser
+from ...domain.errors import ScraperRateLimited, SearchTruncated
+from .profiles import resolve_user_profiles
+
+logger = logging.getLogger(__name__)
+
+# Requests each account may spend per operation and rate-limit window (X uses 15 minutes)
+DEFAULT_BUDGETS = {"search": 50, "profile": 95, "recent_tweets": 50}
+DEFAULT_WINDOW_SECONDS = 15 * 60
+DEFAULT_ERROR_COOLDOWN_SECONDS = 60
+
+
+@dataclass
+class _Account:
+    name: str
+    scraper: ScraperPort
+    window_started: float
+    used: dict[str, int] = field(default_factory=dict)
+    in_flight: int = 0
+    sidelined_until: float = 0.0
+    errors: int = 0
+
+
+class PooledScraper(ScraperPort):
+    """Spreads scraper calls over several accounts, each with its own session.
+
+    Every call is routed to the least-loaded account that still has budget for the
+    operation in the current window. Accounts that hit a rate limit are sidelined
+    until their window resets; accounts that error out are sidelined for a short
+    cooldown and the call is retried on the next account.
+    """
+
+    def __init__(
+        self,
+        scrapers: Sequence[tuple[str, ScraperPort]],
+        budgets: Optional[dict[str, int]] = None,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        error_cooldown: float = DEFAULT_ERROR_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not scrapers:
+            raise ValueError("PooledScraper needs at least one account")
+        self._clock = clock
+        self._budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self._window = window_seconds
+        self._error_cooldown = error_cooldown
+        now = clock()
+        self._accounts = [_Account(name=name, scraper=s, window_started=now) for name, s in scrapers]
+
+    def stats(self) -> list[dict]:
+        now = self._clock()
+        return [
+            {
+                "account": a.name,
+                "in_flight": a.in_flight,
+                "used": dict(a.used),
+                "errors": a.errors,
+                "sidelined_for": max(0.0, a.sidelined_until - now),
+            }
+            for a in self._accounts
+        ]
+
+    def _roll_window(self, account: _Account, now: float) -> None:
+        if now - account.window_started >= self._window:
+            account.window_started = now
+            account.used.clear()
+
+    def _pick(self, op: str, tried: set[str]) -> Optional[_Account]:
+        now = self._clock()
+        budget = self._budgets.get(op)
+        candidates = []
+        for a in self._accounts:
+            self._roll_window(a, now)
+            if a.name in tried or a.sidelined_until > now:
+                continue
+            if budget is not None and a.used.get(op, 0) >= budget:
+                continue
+            candidates.append(a)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda a: (a.in_flight, a.used.get(op, 0)))
+
+    def _next_available_at(self, op: str) -> float:
+        budget = self._budgets.get(op)
+        times = []
+        for a in self._accounts:
+            exhausted = budget is not None and a.used.get(op, 0) >= budget
+            times.append(max(a.sidelined_until, a.window_started + self._window if exhausted else 0.0))
+        return min(times)
+
+    async def _dispatch(self, op: str, call: Callable[[ScraperPort], Awaitable[Any]]) -> Any:
+        tried: set[str] = set()
+        last_error: Optional[Exception] = None
+        while True:
+            account = self._pick(op, tried)
+            if account is None:
+                break
+            tried.add(account.name)
+            account.used[op] = account.used.get(op, 0) + 1
+            account.in_flight += 1
+            try:
+                return await call(account.scraper)
+            except ScraperRateLimited as e:
+                account.sidelined_until = e.reset_at or account.window_started + self._window
+                logger.info("Account %s rate limited on %s until %s", account.name, op, account.sidelined_until)
+                last_error = e
+            except Exception as e:
+                account.errors += 1
+                account.sidelined_until = self._clock() + self._error_cooldown
+                logger.warning("Account %s failed on %s; sidelined", account.name, op, exc_info=True)
+                last_error = e
+            finally:
+                account.in_flight -= 1
+        if last_error is not None and not isinstance(last_error, ScraperRateLimited):
+            raise last_error
+        raise ScraperRateLimited(f"no account has budget for {op}", reset_at=self._next_available_at(op))
+
+    async def search(self, query: str, limit: int = 20) -> Sequence[ScrapedPost]:
+        return await self._dispatch("search", lambda s: s.search(query, limit=limit))
+
+    async def search_tweets(self, query: Query, limit: int = 20) -> Sequence[Tweet]:
+        return await self._dispatch("search", lambda s: s.search_tweets(query, limit=limit))
+
+    async def iter_search_tweets(
+        self, query: Query, limit: int = 20, page_size: int = 20, since_id: Optional[str] = None
+    ) -> AsyncIterator[list[Tweet]]:
+        # A cursor belongs to the session that created it, so a stream stays on one account.
+        # Once that account has spent its search budget the stream ends with SearchTruncated:
+        # the pages so far are kept, but the query's high-water mark stays where it was.
+        account = self._pick("search", set())
+        if account is None:
+            raise ScraperRateLimited("no account has budget for search", reset_at=self._next_available_at("search"))
+        budget = self._budgets.get("search")
+        account.in_flight += 1
+        stream = account.scraper.iter_search_tweets(query, limit=limit, page_size=page_size, since_id=since_id)
+        try:
+            while True:
+                self._roll_window(account, self._clock())
+                if budget is not None and account.used.get("search", 0) >= budget:
+                    logger.info("Account %s spent its search budget; ending the stream early", account.name)
+                    raise SearchTruncated(f"account {account.name} spent its search budget")
+                try:
+                    page = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                except ScraperRateLimited as e:
+                    account.used["search"] = account.used.get("search", 0) + 1
+                    account.sidelined_until = e.reset_at or account.window_started + self._window
+                    raise
+                # Each page is one upstream request
+                account.used["search"] = account.used.get("search", 0) + 1
+                yield page
+        finally:
+            account.in_flight -= 1
+            await stream.aclose()
+
+    async def get_user_profile(self, user_id: str) -> Optional[TwitterUser]:
+        return await self._dispatch("profile", lambda s: s.get_user_profile(user_id))
+
+    @property
+    def supports_user_batch(self) -> bool:
+        return all(a.scraper.supports_user_batch for a in self._accounts)
+
+    async def lookup_user_profiles(self, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+        return await self._dispatch("profile", lambda s: s.lookup_user_profiles(user_ids))
+
+    async def get_user_profiles(self, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+        # Resolved here rather than on one account so every batch and fallback is charged
+        return await resolve_user_profiles(self, user_ids)
+
+    async def get_user_recent_tweets(self, user_id: str, count: int = 3) -> Sequence[Tweet]:
+        return await self._dispatch("recent_tweets", lambda s: s.get_user_recent_tweets(user_id, count=count))
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Optional, Sequence
+
+from ...domain.ports import ScraperPort
+from ...domain.entities import TwitterUser
+from ...domain.errors import ScraperRateLimited
+
+logger = logging.getLogger(__name__)
+
+# Largest id batch X's UsersByRestIds accepts
+USER_BATCH_SIZE = 100
+# In-flight per-user lookups when falling back for ids a batch could not resolve
+USER_FALLBACK_CONCURRENCY = 8
+
+
+async def resolve_user_profiles(scraper: ScraperPort, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+    """Resolve ids batch first, then one by one for whatever the batches missed.
+
+    Every upstream request goes through ``scraper``'s own single-request methods,
+    so a pooled scraper routes and charges each batch and each fallback separately.
+    A failing request only leaves its own ids unresolved. Once a request is rate
+    limited no further ones are sent, and what was resolved so far is returned.
+    """
+    ids = list(dict.fromkeys(user_ids))
+    profiles: dict[str, TwitterUser] = {}
+    if scraper.supports_user_batch:
+        for i in range(0, len(ids), USER_BATCH_SIZE):
+            try:
+                profiles.update(await scraper.lookup_user_profiles(ids[i:i + USER_BATCH_SIZE]))
+            except ScraperRateLimited:
+                logger.info("Profile lookups rate limited; %s of %s ids resolved", len(profiles), len(ids))
+                return profiles
+            except Exception:
+                logger.warning("Batch profile lookup failed; falling back to per-user lookups", exc_info=True)
+
+    semaphore = asyncio.Semaphore(USER_FALLBACK_CONCURRENCY)
+    rate_limited = asyncio.Event()
+
+    async def lookup(uid: str) -> Optional[TwitterUser]:
+        async with semaphore:
+            if rate_limited.is_set():
+                return None
+            try:
+                return await scraper.get_user_profile(uid)
+            except ScraperRateLimited:
+                rate_limited.set()
+            except Exception:
+                logger.warning("Profile lookup failed for user %s", uid, exc_info=True)
+            return None
+
+    # Per-user lookups only for what the batch calls could not resolve
+    missing = [uid for uid in ids if uid not in profiles]
+    for uid, user in zip(missing, await asyncio.gather(*(lookup(uid) for uid in missing))):
+        if user:
+            profiles[uid] = user
+    if rate_limited.is_set():
+        logger.info("Profile lookups rate limited; %s of %s ids resolved", len(profiles), len(ids))
+    return profiles
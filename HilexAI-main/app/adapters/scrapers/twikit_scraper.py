@@ -1,36 +1,189 @@
+import asyncio
+import inspect
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Sequence, Optional
+from functools import partial
+from operator import attrgetter
+from typing import Any, AsyncIterator, Sequence, Optional
 from ...domain.ports import ScraperPort
-from ...domain.entities import ScrapedPost, Query, Tweet, TwitterUser, UserRecentTweet
+from ...domain.entities import ScrapedPost, Query, Tweet, TwitterUser
+from ...domain.errors import ScraperRateLimited, SearchTruncated
+from .profiles import resolve_user_profiles
 
 # twikit is installed; import here to keep adapter boundary
 from twikit import Client  # adjust if your twikit exposes different entry points
+from twikit.constants import USER_FEATURES
+from twikit.errors import NotFound, TooManyRequests, Unauthorized, UserNotFound, UserUnavailable
+from twikit.user import User
+
+# twikit 2.2 has no batch user lookup; set the GraphQL path (e.g. "<queryId>/UsersByRestIds")
+# to resolve profiles in batches through the client's raw GraphQL transport
+USERS_BY_REST_IDS_PATH = os.getenv("TWIKIT_USERS_BY_REST_IDS_PATH")
+
+# The user is gone or hidden: an answer, not a failure of the account that asked
+MISSING_USER_ERRORS = (NotFound, UserNotFound, UserUnavailable)
+
+# Dedicated pool for synchronous twikit clients, shared by all scraper instances
+TWIKIT_THREADS = int(os.getenv("TWIKIT_THREADS", "4"))
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=TWIKIT_THREADS, thread_name_prefix="twikit")
+    return _executor
+
+
+def _parse_created(created: Any) -> datetime:
+    if isinstance(created, datetime):
+        return created
+    if isinstance(created, str):
+        try:
+            return datetime.fromisoformat(created.replace("Z", "+00:00"))
+        except ValueError:
+            # X's legacy format, e.g. "Wed Oct 10 20:19:24 +0000 2018"
+            return datetime.strptime(created, "%a %b %d %H:%M:%S %z %Y")
+    return datetime.now(timezone.utc)
+
+
+def _best_mp4(media: dict) -> Optional[str]:
+    # Videos and GIFs come in several encodings; keep the highest-bitrate MP4
+    variants = (media.get("video_info") or {}).get("variants") or []
+    mp4 = [v for v in variants if v.get("content_type") == "video/mp4" and v.get("url")]
+    if not mp4:
+        return None
+    return max(mp4, key=lambda v: v.get("bitrate") or 0)["url"]
+
+
+def _entities(t: Any) -> dict:
+    """Entities of a tweet; twikit keeps them only in the raw payload (``_data.legacy.entities``)"""
+    legacy = (getattr(t, "_data", None) or {}).get("legacy") or {}
+    return legacy.get("entities") or getattr(t, "entities", None) or {}
+
+
+def _media_urls(t: Any, entities: dict) -> list[str]:
+    """Downloadable URL of each photo and video attached to a tweet"""
+    legacy = (getattr(t, "_data", None) or {}).get("legacy") or {}
+    # extended_entities has every attachment with its video variants; entities.media only the first
+    items = (
+        (legacy.get("extended_entities") or {}).get("media")
+        or getattr(t, "media", None)
+        or entities.get("media")
+        or []
+    )
+    urls: list[str] = []
+    for m in items:
+        if not isinstance(m, dict):
+            continue
+        kind = m.get("type")
+        if kind == "photo":
+            url = m.get("media_url_https") or m.get("media_url")
+        elif kind in ("video", "animated_gif"):
+            url = _best_mp4(m)
+        else:
+            url = None
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
 
 class TwikitScraper(ScraperPort):
-    def __init__(self) -> None:
-        self._client = Client("en-US")  # locale example; tweak as needed
-        self._email = os.getenv("TWIKIT_EMAIL")
-        self._username = os.getenv("TWIKIT_USERNAME")
-        self._password = os.getenv("TWIKIT_PASSWORD")
+    def __init__(
+        self,
+        client: Any = None,
+        email: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        cookies_path: Optional[str] = None,
+    ) -> None:
+        self._client = client or Client("en-US")  # locale example; tweak as needed
+        self._email = email or os.getenv("TWIKIT_EMAIL")
+        self._username = username or os.getenv("TWIKIT_USERNAME")
+        self._password = password or os.getenv("TWIKIT_PASSWORD")
+        # Authenticated session cookies survive restarts so warm processes never log in
+        self._cookies_path = cookies_path or os.getenv("TWIKIT_COOKIES_PATH", ".twikit_cookies.json")
         self._logged_in = False
+        self._session_generation = 0
+        self._login_lock = asyncio.Lock()
 
-    async def _ensure_login(self):
-        if not self._logged_in:
-            # twikit login may be sync; if so, run in thread or adapt.
-            # For many twikit versions, login is synchronous. We'll call it directly here.
-            self._client.login(
-                auth_info_1=self._email,
-                auth_info_2=self._username,
-                password=self._password
-            )
-            self._logged_in = True
+    async def _call(self, method_name: str, *args, **kwargs) -> Any:
+        """Call a client method without ever blocking the event loop.
 
-    async def search(self, query: str, limit: int = 20) -> Sequence[ScrapedPost]:
+        ``method_name`` may be dotted to reach nested objects (``"gql.gql_get"``).
+        twikit 2.x exposes coroutines, which are awaited natively. Synchronous
+        clients (older twikit versions) are offloaded to the twikit thread pool.
+        """
+        method = attrgetter(method_name)(self._client)
+        if inspect.iscoroutinefunction(method):
+            return await method(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), partial(method, *args, **kwargs))
+
+    async def _ensure_login(self, force: bool = False, generation: Optional[int] = None) -> None:
+        """Reuse the persisted session if there is one; log in with credentials otherwise.
+
+        ``force`` discards the current session (it was rejected upstream).
+        ``generation`` is the session the rejected request was sent with; if another
+        caller has re-logged in since, the newer session is kept. Concurrent callers
+        that saw the same rejected session therefore trigger a single re-login.
+        """
+        if generation is None:
+            generation = self._session_generation
+        if self._logged_in and not force:
+            return
+        async with self._login_lock:
+            if self._session_generation != generation or (self._logged_in and not force):
+                return
+            if not force and self._load_session():
+                self._logged_in = True
+            else:
+                await self._call(
+                    "login",
+                    auth_info_1=self._email,
+                    auth_info_2=self._username,
+                    password=self._password
+                )
+                self._save_session()
+                self._logged_in = True
+            self._session_generation += 1
+
+    def _load_session(self) -> bool:
+        if not self._cookies_path or not os.path.exists(self._cookies_path):
+            return False
+        try:
+            self._client.load_cookies(self._cookies_path)
+        except Exception:
+            return False
+        return True
+
+    def _save_session(self) -> None:
+        if not self._cookies_path or not hasattr(self._client, "save_cookies"):
+            return
+        try:
+            self._client.save_cookies(self._cookies_path)
+        except OSError:
+            pass  # an unwritable cookie file only costs a login on the next restart
+
+    async def _request(self, method_name: str, *args, **kwargs) -> Any:
+        """Authenticated client call; re-authenticates once if the session is rejected"""
         await self._ensure_login()
+        # Captured before the call: a 401 may arrive after another caller re-logged in
+        generation = self._session_generation
+        try:
+            try:
+                return await self._call(method_name, *args, **kwargs)
+            except Unauthorized:
+                await self._ensure_login(force=True, generation=generation)
+                return await self._call(method_name, *args, **kwargs)
+        except TooManyRequests as e:
+            raise ScraperRateLimited(str(e), reset_at=e.rate_limit_reset) from e
+
+    async def search(self, query: str, limit: int = 20) -> Sequence[ScrapedPost]:
         # NOTE: Adjust to your twikit version's API. Many provide .search_tweet or similar.
         # We'll demonstrate a generic approach:
-        results = self._client.search_tweet(query=query, count=limit)
+        results = await self._request("search_tweet", query, "Latest", count=limit)
 
         posts: list[ScrapedPost] = []
         for t in results:
@@ -38,14 +191,7 @@ class TwikitScraper(ScraperPort):
             post_id = str(getattr(t, "id", getattr(t, "tweet_id", "")))
             author = getattr(t, "user", getattr(t, "username", "unknown"))
             text = getattr(t, "text", "")
-            created = getattr(t, "created_at", None)
-            if isinstance(created, str):
-                # fallback parse if needed
-                created_dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-            elif isinstance(created, datetime):
-                created_dt = created
-            else:
-                created_dt = datetime.now(timezone.utc)
+            created_dt = _parse_created(getattr(t, "created_at", None))
 
             url = f"https://x.com/{author}/status/{post_id}" if post_id and author else None
             posts.append(ScrapedPost(
@@ -54,75 +200,107 @@ class TwikitScraper(ScraperPort):
             ))
         return posts
 
+    def _to_tweet(self, t: Any, query_id: Optional[int]) -> Tweet:
+        tweet_id = str(getattr(t, "id", getattr(t, "tweet_id", "")))
+        user = getattr(t, "user", None)
+        username = getattr(user, "screen_name", getattr(t, "username", None))
+        author_id = str(getattr(user, "id", getattr(t, "user_id", "")))
+        text = getattr(t, "text", "")
+        created_dt = _parse_created(getattr(t, "created_at", None))
+
+        metrics = getattr(t, "public_metrics", None) or {}
+        retweet_count = int(getattr(t, "retweet_count", metrics.get("retweet_count", 0)) or 0)
+        like_count = int(getattr(t, "favorite_count", metrics.get("like_count", 0)) or 0)
+        reply_count = int(metrics.get("reply_count", getattr(t, "reply_count", 0)) or 0)
+        quote_count = int(metrics.get("quote_count", getattr(t, "quote_count", 0)) or 0)
+
+        entities = _entities(t)
+        # twikit's Tweet.hashtags also covers long (note) tweets, whose entities live elsewhere
+        raw_hashtags = getattr(t, "hashtags", None) or entities.get("hashtags", [])
+        # Lowercased: X matches both case-insensitively, and stored values feed containment lookups
+        hashtags = [(h["text"] if isinstance(h, dict) else str(h)).lower() for h in raw_hashtags]
+        mentions = [(m["screen_name"] if isinstance(m, dict) else str(m)).lower() for m in entities.get("user_mentions", [])]
+        media_urls = _media_urls(t, entities)
+
+        tweet_type = "original"
+        if getattr(t, "is_retweet", False):
+            tweet_type = "retweet"
+        elif getattr(t, "in_reply_to_status_id", None):
+            tweet_type = "reply"
+        elif getattr(t, "is_quote_status", False):
+            tweet_type = "quote"
+
+        original_url = None
+        if username and tweet_id:
+            original_url = f"https://x.com/{username}/status/{tweet_id}"
+
+        return Tweet(
+            tweet_id=tweet_id,
+            text=text,
+            author_id=author_id,
+            created_at=created_dt,
+            retweet_count=retweet_count,
+            like_count=like_count,
+            reply_count=reply_count,
+            quote_count=quote_count,
+            tweet_type=tweet_type,
+            hashtags=hashtags or None,
+            mentions=mentions or None,
+            media_urls=media_urls or None,
+            query_id=query_id,
+            source="x",
+            original_url=original_url,
+            scraped_at=datetime.now(timezone.utc),
+        )
+
+    async def iter_search_tweets(
+        self, query: Query, limit: int = 20, page_size: int = 20, since_id: Optional[str] = None
+    ) -> AsyncIterator[list[Tweet]]:
+        """Yield search results page by page, following the cursor until ``limit``.
+
+        With ``since_id`` the search is narrowed with X's since_id operator and the
+        stream stops at the first tweet that is not newer than it. Reaching ``limit``
+        with results left raises ``SearchTruncated``.
+        """
+        search_text = query.search_text
+        if since_id:
+            search_text = f"{search_text} since_id:{since_id}"
+        remaining = limit
+        cursor = None
+        while True:
+            if remaining <= 0:
+                raise SearchTruncated(f"stopped at the limit of {limit} tweets")
+            results = await self._request(
+                "search_tweet", search_text, "Latest", count=min(page_size, remaining), cursor=cursor
+            )
+            fetched = list(results)
+            page = [self._to_tweet(t, query.id) for t in fetched[:remaining]]
+            if not page:
+                return
+            cut = len(fetched) > len(page)
+            reached_known = False
+            if since_id:
+                fresh = [t for t in page if int(t.tweet_id) > int(since_id)]
+                reached_known = len(fresh) < len(page)
+                page = fresh
+            if page:
+                remaining -= len(page)
+                yield page
+            cursor = getattr(results, "next_cursor", None)
+            if reached_known or not (cursor or cut):
+                return
+
     async def search_tweets(self, query: Query, limit: int = 20) -> Sequence[Tweet]:
-        await self._ensure_login()
-        # Attempt to use an advanced search if available; fallback to simple
-        results = self._client.search_tweet(query=query.search_text, count=limit)
         tweets: list[Tweet] = []
-        for t in results:
-            tweet_id = str(getattr(t, "id", getattr(t, "tweet_id", "")))
-            user = getattr(t, "user", None)
-            username = getattr(user, "screen_name", getattr(t, "username", None))
-            author_id = str(getattr(user, "id", getattr(t, "user_id", "")))
-            text = getattr(t, "text", "")
-            created = getattr(t, "created_at", None)
-            if isinstance(created, str):
-                created_dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-            elif isinstance(created, datetime):
-                created_dt = created
-            else:
-                created_dt = datetime.now(timezone.utc)
-
-            metrics = getattr(t, "public_metrics", None) or {}
-            retweet_count = int(getattr(t, "retweet_count", metrics.get("retweet_count", 0)) or 0)
-            like_count = int(getattr(t, "favorite_count", metrics.get("like_count", 0)) or 0)
-            reply_count = int(metrics.get("reply_count", getattr(t, "reply_count", 0)) or 0)
-            quote_count = int(metrics.get("quote_count", getattr(t, "quote_count", 0)) or 0)
-
-            entities = getattr(t, "entities", {}) or {}
-            hashtags = [h["text"] if isinstance(h, dict) else str(h) for h in entities.get("hashtags", [])]
-            mentions = [m["screen_name"] if isinstance(m, dict) else str(m) for m in entities.get("user_mentions", [])]
-
-            tweet_type = "original"
-            if getattr(t, "is_retweet", False):
-                tweet_type = "retweet"
-            elif getattr(t, "in_reply_to_status_id", None):
-                tweet_type = "reply"
-            elif getattr(t, "is_quote_status", False):
-                tweet_type = "quote"
-
-            original_url = None
-            if username and tweet_id:
-                original_url = f"https://x.com/{username}/status/{tweet_id}"
-
-            tweets.append(Tweet(
-                tweet_id=tweet_id,
-                text=text,
-                author_id=author_id,
-                created_at=created_dt,
-                retweet_count=retweet_count,
-                like_count=like_count,
-                reply_count=reply_count,
-                quote_count=quote_count,
-                tweet_type=tweet_type,
-                hashtags=hashtags or None,
-                mentions=mentions or None,
-                media_urls=None,  # media URLs resolving can be added if available
-                query_id=query.id,
-                source="x",
-                original_url=original_url,
-                scraped_at=datetime.now(timezone.utc),
-            ))
+        try:
+            async for page in self.iter_search_tweets(query, limit=limit):
+                tweets.extend(page)
+        except SearchTruncated:
+            pass
         return tweets
 
-    async def get_user_profile(self, user_id: str) -> Optional[TwitterUser]:
-        await self._ensure_login()
-        try:
-            u = self._client.get_user_by_user_id(user_id)
-        except Exception:
-            return None
-        if not u:
-            return None
+    @staticmethod
+    def _to_user(u: Any, user_id: str) -> TwitterUser:
         return TwitterUser(
             user_id=str(getattr(u, "id", user_id)),
             username=getattr(u, "screen_name", getattr(u, "username", "")),
@@ -136,23 +314,58 @@ class TwikitScraper(ScraperPort):
             auto_update=False,
         )
 
+    async def get_user_profile(self, user_id: str) -> Optional[TwitterUser]:
+        # Other errors propagate, so a pool can sideline an account that keeps failing
+        try:
+            u = await self._request("get_user_by_id", user_id)
+        except MISSING_USER_ERRORS:
+            return None
+        if not u:
+            return None
+        return self._to_user(u, user_id)
+
+    @property
+    def supports_user_batch(self) -> bool:
+        return hasattr(self._client, "get_users_by_ids") or bool(
+            USERS_BY_REST_IDS_PATH and hasattr(self._client, "gql")
+        )
+
+    async def lookup_user_profiles(self, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+        resolved = await self._lookup_users_batch(list(user_ids))
+        profiles = [self._to_user(u, "") for u in resolved]
+        return {p.user_id: p for p in profiles}
+
+    async def _lookup_users_batch(self, user_ids: list[str]) -> list[Any]:
+        if hasattr(self._client, "get_users_by_ids"):
+            return list(await self._request("get_users_by_ids", user_ids) or [])
+        if not self.supports_user_batch:
+            return []
+        response, _ = await self._request(
+            "gql.gql_get",
+            f"https://x.com/i/api/graphql/{USERS_BY_REST_IDS_PATH}",
+            {"userIds": user_ids},
+            USER_FEATURES,
+        )
+        users = []
+        for item in response.get("data", {}).get("users", []):
+            result = item.get("result")
+            if result and result.get("__typename") == "User":
+                users.append(User(self._client, result))
+        return users
+
+    async def get_user_profiles(self, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+        return await resolve_user_profiles(self, user_ids)
+
     async def get_user_recent_tweets(self, user_id: str, count: int = 3) -> Sequence[Tweet]:
-        await self._ensure_login()
         try:
-            results = self._client.get_user_tweets(user_id=user_id, count=count)
-        except Exception:
+            results = await self._request("get_user_tweets", user_id, "Tweets", count=count)
+        except MISSING_USER_ERRORS:
             results = []
         tweets: list[Tweet] = []
         for t in results:
             tweet_id = str(getattr(t, "id", getattr(t, "tweet_id", "")))
             text = getattr(t, "text", "")
-            created = getattr(t, "created_at", None)
-            if isinstance(created, str):
-                created_dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-            elif isinstance(created, datetime):
-                created_dt = created
-            else:
-                created_dt = datetime.now(timezone.utc)
+            created_dt = _parse_created(getattr(t, "created_at", None))
             tweets.append(Tweet(
                 tweet_id=tweet_id,
                 text=text,
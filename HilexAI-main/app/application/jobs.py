@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Awaitable, Callable, Optional
+
+from ..domain.entities import ScrapeJob
+from .use_cases import ExecutionScope
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeJobWorkerPool:
+    """Bounded pool of workers draining the persisted scrape job queue.
+
+    Jobs live in the database: workers claim them atomically, heart-beat while they
+    run and store the final ScrapeResult. Jobs of a worker that died (no heartbeat for
+    ``stale_after``) are put back in the queue, so executions survive restarts.
+    """
+
+    def __init__(
+        self,
+        scope_factory: Callable[[], AsyncContextManager[ExecutionScope]],
+        workers: int = 2,
+        poll_seconds: float = 5.0,
+        stale_after: timedelta = timedelta(minutes=5),
+        max_attempts: int = 3,
+    ) -> None:
+        self._scope_factory = scope_factory
+        self._workers = max(1, workers)
+        self._poll_seconds = poll_seconds
+        self._stale_after = stale_after
+        self._max_attempts = max_attempts
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+            self._tasks.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers right away instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    async def _wait_for_work(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                async with self._scope_factory() as scope:
+                    job = await scope.jobs.claim_next()
+            except Exception:
+                logger.exception("Claiming a scrape job failed")
+                job = None
+            if job is None:
+                await self._wait_for_work()
+                continue
+            await self._process(job)
+
+    async def _reaper(self) -> None:
+        while True:
+            try:
+                async with self._scope_factory() as scope:
+                    requeued = await scope.jobs.requeue_stale(datetime.now(timezone.utc) - self._stale_after)
+                if requeued:
+                    logger.warning("Requeued %s stale scrape jobs", requeued)
+                    self.notify()
+            except Exception:
+                logger.exception("Requeueing stale scrape jobs failed")
+            await asyncio.sleep(self._stale_after.total_seconds() / 2)
+
+    async def _process(self, job: ScrapeJob) -> None:
+        # Job bookkeeping gets its own session so progress is visible while the run is in flight
+        async with self._scope_factory() as tracker:
+            if job.attempts > self._max_attempts:
+                await tracker.jobs.finish(job.id, "failed", error="gave up after repeated worker crashes")
+                return
+            lock = asyncio.Lock()  # progress callback and heartbeat share the tracker session
+
+            async def beat(progress: Optional[dict] = None) -> None:
+                async with lock:
+                    await tracker.jobs.heartbeat(job.id, progress)
+
+            done = asyncio.Event()
+            heartbeat = asyncio.create_task(self._heartbeat(beat, done))
+            try:
+                async with self._scope_factory() as scope:
+                    result = await scope.execute_query.execute(query_id=job.query_id, progress=beat, **job.params)
+            except Exception as e:
+                logger.exception("Scrape job %s failed", job.id)
+                status, result, error = "failed", None, f"{type(e).__name__}: {e}"
+            else:
+                status, error = "succeeded", None
+            finally:
+                done.set()  # let the heartbeat finish its statement instead of cancelling mid-query
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            await tracker.jobs.finish(job.id, status, result=result, error=error)
+
+    async def _heartbeat(self, beat: Callable[[], Awaitable[None]], done: asyncio.Event) -> None:
+        while not done.is_set():
+            try:
+                await asyncio.wait_for(done.wait(), timeout=self._stale_after.total_seconds() / 3)
+            except asyncio.TimeoutError:
+                await beat()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
+
+from ..domain.ports import TwitterUserRepositoryPort
+
+
+class ProfileFreshnessCache:
+    """Decides which authors actually need a profile refresh.
+
+    Tier 1 is an in-process LRU of recently refreshed authors (and, for a shorter
+    time, authors whose lookup failed). Tier 2 asks the database for authors whose
+    ``users.updated_at`` is younger than ``max_age``. Only authors missing from both
+    are returned as stale. Hit/miss counters are kept for tuning the TTLs.
+    """
+
+    def __init__(
+        self,
+        max_age: timedelta = timedelta(hours=6),
+        negative_ttl: timedelta = timedelta(hours=1),
+        max_entries: int = 50_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_age = max_age.total_seconds()
+        self._negative_ttl = negative_ttl.total_seconds()
+        self._max_entries = max_entries
+        self._clock = clock
+        # user_id -> (expires_at, lookup_succeeded)
+        self._entries: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _put(self, user_id: str, expires_at: float, ok: bool) -> None:
+        self._entries[user_id] = (expires_at, ok)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def remember(self, user_ids: Iterable[str], ok: bool = True) -> None:
+        ttl = self._max_age if ok else self._negative_ttl
+        expires_at = self._clock() + ttl
+        for uid in user_ids:
+            self._put(uid, expires_at, ok)
+
+    async def stale_ids(self, user_ids: Iterable[str], user_repo: TwitterUserRepositoryPort) -> set[str]:
+        now = self._clock()
+        unknown: list[str] = []
+        for uid in user_ids:
+            entry = self._entries.get(uid)
+            if entry is None or entry[0] <= now:
+                unknown.append(uid)
+                continue
+            self._entries.move_to_end(uid)
+            if entry[1]:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        if not unknown:
+            return set()
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self._max_age)
+        fresh = await user_repo.get_updated_since(unknown, cutoff)
+        for uid, updated_at in fresh.items():
+            self._put(uid, updated_at.timestamp() + self._max_age, True)
+        self.db_hits += len(fresh)
+        stale = {uid for uid in unknown if uid not in fresh}
+        self.misses += len(stale)
+        return stale
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "max_age_seconds": self._max_age,
+            "negative_ttl_seconds": self._negative_ttl,
+        }
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Callable, Optional
+
+from ..domain.entities import Query, QueryRun
+from .use_cases import ExecutionScope
+
+logger = logging.getLogger(__name__)
+
+_NAMED_INTERVALS = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+_INTERVAL_RE = re.compile(r"^\s*(\d+)\s*([smhdw])\s*$")
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_interval(value: Optional[str]) -> Optional[timedelta]:
+    """Parse a schedule_interval such as "30m", "6h", "daily"; None if unscheduled/invalid"""
+    if not value:
+        return None
+    named = _NAMED_INTERVALS.get(value.strip().lower())
+    if named:
+        return named
+    m = _INTERVAL_RE.match(value.lower())
+    if not m or int(m.group(1)) == 0:
+        return None
+    return timedelta(**{_UNITS[m.group(2)]: int(m.group(1))})
+
+
+def next_run_at(query: Query, interval: timedelta) -> datetime:
+    """Next slot on the query's own grid after its last run.
+
+    Each query gets a stable phase inside its interval (derived from its id), so
+    queries sharing an interval are spread evenly instead of all firing on the hour.
+    """
+    if query.last_run_at is None:
+        return _EPOCH
+    step = interval.total_seconds()
+    phase = (zlib.crc32(str(query.id).encode()) % 10_000) / 10_000 * step
+    last = (query.last_run_at - _EPOCH).total_seconds()
+    slots = (last - phase) // step + 1
+    return _EPOCH + timedelta(seconds=slots * step + phase)
+
+
+class QueryScheduler:
+    """Runs active queries according to their schedule_interval.
+
+    Every ``poll_seconds`` the scheduler loads active queries, picks the due ones and
+    runs them with at most ``max_concurrency`` in flight, each after a random start
+    delay of up to ``jitter_seconds``. A run is claimed by atomically moving
+    ``last_run_at`` forward, so several app workers never execute the same slot twice.
+    """
+
+    def __init__(
+        self,
+        scope_factory: Callable[[], AsyncContextManager[ExecutionScope]],
+        max_concurrency: int = 2,
+        poll_seconds: float = 30.0,
+        jitter_seconds: float = 60.0,
+        query_limit: int = 50,
+    ) -> None:
+        self._scope_factory = scope_factory
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._poll_seconds = poll_seconds
+        self._jitter_seconds = jitter_seconds
+        self._query_limit = query_limit
+        self._running: dict[int, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._loop_task, *self._running.values()] if t]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._running.clear()
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(self._poll_seconds)
+
+    def due_queries(self, queries: list[Query], now: datetime) -> list[Query]:
+        due = []
+        for q in queries:
+            interval = parse_interval(q.schedule_interval)
+            if interval is None or q.id in self._running:
+                continue
+            if next_run_at(q, interval) <= now:
+                due.append(q)
+        return due
+
+    async def tick(self) -> None:
+        async with self._scope_factory() as scope:
+            queries = await scope.queries.list_active()
+        for q in self.due_queries(queries, datetime.now(timezone.utc)):
+            task = asyncio.create_task(self._run(q))
+            self._running[q.id] = task
+            task.add_done_callback(lambda _, qid=q.id: self._running.pop(qid, None))
+
+    async def _run(self, query: Query) -> None:
+        # Jitter before taking a slot, so waiting does not hold one of the execution slots
+        await asyncio.sleep(random.uniform(0, self._jitter_seconds))
+        async with self._semaphore:
+            started = datetime.now(timezone.utc)
+            async with self._scope_factory() as scope:
+                if not await scope.queries.claim_run(query.id, query.last_run_at, started):
+                    return  # another worker took this slot
+                try:
+                    result = await scope.execute_query.execute(query_id=query.id, limit=self._query_limit)
+                    run = QueryRun(
+                        id=None, query_id=query.id, started_at=started, finished_at=datetime.now(timezone.utc),
+                        status="succeeded", found=result["found"], saved=result["saved"],
+                    )
+                except Exception as e:
+                    logger.exception("Scheduled run of query %s failed", query.id)
+                    run = QueryRun(
+                        id=None, query_id=query.id, started_at=started, finished_at=datetime.now(timezone.utc),
+                        status="failed", error=f"{type(e).__name__}: {e}",
+                    )
+            # Fresh session: a failed execution may have left the previous one unusable
+            async with self._scope_factory() as scope:
+                await scope.runs.save(run)
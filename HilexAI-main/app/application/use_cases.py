@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+import asyncio
+import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Sequence
+from typing import Awaitable, Callable, Optional, Sequence
 
-from fastapi import Depends
-
-from ..domain.entities import ScrapedPost, Query, Tweet, TwitterUser, MediaFile, UserRecentTweet
+from ..domain.entities import ScrapedPost, Tweet, TweetDelta, TwitterUser, MediaFile, UserRecentTweet
+from ..domain.errors import ScraperRateLimited, SearchTruncated
 from ..domain.ports import (
     ScraperPort,
     PostRepositoryPort,
@@ -14,8 +15,24 @@ from ..domain.ports import (
     TweetRepositoryPort,
     TwitterUserRepositoryPort,
     MediaFileRepositoryPort,
+    MediaDownloaderPort,
     UserRecentTweetRepositoryPort,
+    TweetMetricSnapshotRepositoryPort,
+    StatsRepositoryPort,
+    ResponseCachePort,
+    UnitOfWorkPort,
+    QueryRunRepositoryPort,
+    ScrapeJobRepositoryPort,
+    QUERIES_TAG,
+    TWEETS_TAG,
+    query_tag,
 )
+from .profile_cache import ProfileFreshnessCache
+
+logger = logging.getLogger(__name__)
+
+# Receives {"stage": ..., **counters} as an execution advances
+ProgressCallback = Callable[[dict], Awaitable[None]]
 
 
 class ScrapeAndStorePostsUseCase:
@@ -39,6 +56,15 @@ class ExecuteQueryUseCase:
         user_repo: TwitterUserRepositoryPort,
         media_repo: MediaFileRepositoryPort,
         user_recent_repo: UserRecentTweetRepositoryPort,
+        enrichment_concurrency: int = 8,
+        search_page_size: int = 20,
+        profile_cache: Optional[ProfileFreshnessCache] = None,
+        snapshot_repo: Optional[TweetMetricSnapshotRepositoryPort] = None,
+        stats_repo: Optional[StatsRepositoryPort] = None,
+        response_cache: Optional[ResponseCachePort] = None,
+        media_downloader: Optional[MediaDownloaderPort] = None,
+        unit_of_work: Optional[UnitOfWorkPort] = None,
+        checkpoint_pages: int = 1,
     ):
         self._scraper = scraper
         self._query_repo = query_repo
@@ -46,6 +72,18 @@ class ExecuteQueryUseCase:
         self._user_repo = user_repo
         self._media_repo = media_repo
         self._user_recent_repo = user_recent_repo
+        self._enrichment_concurrency = max(1, enrichment_concurrency)
+        self._search_page_size = search_page_size
+        self._profile_cache = profile_cache
+        self._snapshot_repo = snapshot_repo
+        self._stats_repo = stats_repo
+        self._response_cache = response_cache
+        self._media_downloader = media_downloader
+        # With a unit of work the repositories only flush. The search stage commits every
+        # ``checkpoint_pages`` pages (0: once, at its end), and so does each later stage,
+        # so by default no transaction stays open across a scraper or download call
+        self._unit_of_work = unit_of_work
+        self._checkpoint_pages = checkpoint_pages
 
     async def execute(
         self,
@@ -53,57 +91,226 @@ class ExecuteQueryUseCase:
         limit: int = 50,
         include_media: bool = True,
         update_user_profiles: bool = True,
+        incremental: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> dict:
+        try:
+            return await self._execute(query_id, limit, include_media, update_user_profiles, incremental, progress)
+        except BaseException:
+            # Work since the last checkpoint is discarded as a whole
+            if self._unit_of_work:
+                await self._unit_of_work.rollback()
+            raise
+
+    async def _commit(self, tags: Sequence[str]) -> None:
+        """Make the work so far durable, then drop cached reads it made stale"""
+        if self._unit_of_work:
+            await self._unit_of_work.commit()
+        if self._response_cache and tags:
+            await self._response_cache.invalidate(tags)
+
+    async def _execute(
+        self,
+        query_id: int,
+        limit: int,
+        include_media: bool,
+        update_user_profiles: bool,
+        incremental: bool,
+        progress: Optional[ProgressCallback],
     ) -> dict:
+        async def report(stage: str, **counters) -> None:
+            if progress:
+                await progress({"stage": stage, **counters})
+
         q = await self._query_repo.get_by_id(query_id)
         if not q or not q.is_active:
-            return {"found": 0, "saved": 0, "media_files_saved": 0, "users_updated": 0, "query_id": query_id}
+            return {"found": 0, "saved": 0, "updated": 0, "media_files_saved": 0, "users_updated": 0, "query_id": query_id}
+
+        # Persist each page as it arrives; only author ids and media references are kept
+        found = inserted = updated = snapshots = pages = 0
+        user_ids: set[str] = set()
+        media_files: list[MediaFile] = []
+        newest: Optional[Tweet] = None
+        # Rollup changes of the pages written since the last checkpoint
+        deltas: list[TweetDelta] = []
+
+        async def checkpoint() -> None:
+            # Rollups are updated once per checkpoint, right before it commits, so their
+            # rows are locked (in key order) only for the end of each transaction
+            if self._stats_repo and deltas:
+                await self._stats_repo.apply(deltas)
+            deltas.clear()
+            await self._commit([TWEETS_TAG])
 
-        tweets: Sequence[Tweet] = await self._scraper.search_tweets(q, limit=limit)
-        # Save tweets
-        saved_tweets = await self._tweet_repo.save_many(list(tweets))
+        since_id = q.high_water_tweet_id if incremental else None
+        await report("searching", since_id=since_id)
+        complete = True
+        try:
+            async for page in self._scraper.iter_search_tweets(
+                q, limit=limit, page_size=self._search_page_size, since_id=since_id
+            ):
+                if self._tweet_repo.needs_storage_for(page):
+                    # New partitions are created on their own connection and would wait on
+                    # the locks of this execution's open transaction
+                    await checkpoint()
+                    await self._tweet_repo.create_storage_for(page)
+                # Save new tweets and refresh metrics of the ones we have already seen
+                upserted = await self._tweet_repo.upsert_many(page)
+                found += len(page)
+                inserted += upserted.inserted
+                updated += upserted.updated
+                # Every sighting extends the engagement history (unchanged metrics are skipped)
+                if self._snapshot_repo:
+                    snapshots += await self._snapshot_repo.record(page)
+                deltas.extend(upserted.deltas)
+                pages += 1
+                if not self._unit_of_work or (self._checkpoint_pages and pages % self._checkpoint_pages == 0):
+                    await checkpoint()
+                user_ids.update(t.author_id for t in page)
+                page_newest = max(page, key=lambda t: int(t.tweet_id))
+                if newest is None or int(page_newest.tweet_id) > int(newest.tweet_id):
+                    newest = page_newest
+                if include_media:
+                    media_files.extend(self._media_files(page))
+                await report("saving_tweets", found=found, saved=inserted, updated=updated)
+        except SearchTruncated as e:
+            logger.info("Search for query %s stopped early (%s); keeping its high-water mark", query_id, e)
+            complete = False
+
+        # Only after the stream reached the old mark or ran out of results: a run that died
+        # halfway, or stopped at the limit or the account budget, must not skip the gap below
+        if newest is not None and complete:
+            await self._query_repo.advance_high_water(q.id, newest.tweet_id, newest.created_at)
+        if self._stats_repo and deltas:
+            await self._stats_repo.apply(deltas)
 
         users_updated = 0
+        users_failed = 0
         media_saved = 0
 
+        users_cached = 0
+        refreshed: set[str] = set()
+        to_refresh: set[str] = set()
+
         if update_user_profiles:
-            # Upsert users referenced in tweets
-            user_ids = {t.author_id for t in tweets}
-            for uid in user_ids:
-                profile = await self._scraper.get_user_profile(uid)
-                if profile:
-                    await self._user_repo.save(profile)
-                    # Update user's recent tweets table
-                    recent = await self._scraper.get_user_recent_tweets(uid, count=3)
-                    recent_user_tweets = [
-                        UserRecentTweet(id=None, user_id=uid, tweet_id=t.tweet_id, text=t.text, created_at=t.created_at)
-                        for t in recent
-                    ]
-                    await self._user_recent_repo.save_user_tweets(uid, recent_user_tweets)
-                    users_updated += 1
-
-        if include_media:
-            # For each tweet, if there are media URLs, persist references
-            media_files: list[MediaFile] = []
-            for t in tweets:
-                if not t.media_urls:
-                    continue
-                for media_url in t.media_urls:
-                    media_files.append(MediaFile(
-                        id=None,
-                        tweet_id=t.tweet_id,
-                        media_type="photo" if any(media_url.lower().endswith(ext) for ext in [".jpg", ".jpeg", ".png", ".gif"]) else "video",
-                        original_url=media_url,
-                    ))
-            if media_files:
-                media_saved = await self._media_repo.save_many(media_files)
+            # Skip authors refreshed recently (or whose lookup just failed)
+            to_refresh = user_ids
+            if self._profile_cache:
+                to_refresh = await self._profile_cache.stale_ids(user_ids, self._user_repo)
+                users_cached = len(user_ids) - len(to_refresh)
+
+        # The search stage is durable before the scraper is called again
+        await self._commit([TWEETS_TAG, QUERIES_TAG, query_tag(query_id)])
+
+        if update_user_profiles:
+            # Enrich all authors concurrently, then persist the whole batch at once
+            await report("enriching_users", users=len(to_refresh), cached=users_cached)
+            enriched = await self._enrich_authors(to_refresh)
+            users_failed = len(to_refresh) - len(enriched)
+            saved_users = await self._user_repo.save_many([profile for profile, _ in enriched])
+            # Authors whose recent tweets could not be fetched keep the ones already stored
+            await self._user_recent_repo.save_many_user_tweets(
+                {profile.user_id: recent for profile, recent in enriched if recent is not None}
+            )
+            users_updated = len(saved_users)
+            refreshed = {u.user_id for u in saved_users}
+
+        if media_files:
+            # A tweet seen again (same run or an earlier one) keeps the attachments it already has
+            unique = {(m.tweet_id, m.original_url): m for m in media_files}
+            known = await self._media_repo.get_known_urls(list({m.tweet_id for m in media_files}))
+            media_files = [m for key, m in unique.items() if key not in known]
+
+        # Profiles are durable (and no read stays open) before the downloads start; only
+        # now may the freshness cache mark authors, a rolled-back run must not
+        await self._commit([])
+        if self._profile_cache and update_user_profiles:
+            self._profile_cache.remember(refreshed)
+            self._profile_cache.remember(to_refresh - refreshed, ok=False)
+
+        if media_files:
+            if self._media_downloader:
+                await report("downloading_media", media_files=len(media_files))
+                media_files = await self._media_downloader.download_many(media_files)
+            await report("saving_media", media_files=len(media_files))
+            media_saved = await self._media_repo.save_many(media_files)
 
         await self._query_repo.update_last_run(query_id, datetime.now(timezone.utc))
+        await self._commit([TWEETS_TAG, QUERIES_TAG, query_tag(query_id)])
 
         return {
-            "found": len(tweets),
-            "saved": saved_tweets,
+            "found": found,
+            "saved": inserted,
+            "updated": updated,
             "media_files_saved": media_saved,
             "users_updated": users_updated,
+            "users_failed": users_failed,
+            "users_cached": users_cached,
+            "snapshots": snapshots,
             "query_id": query_id,
         }
 
+    @staticmethod
+    def _media_files(tweets: Sequence[Tweet]) -> list[MediaFile]:
+        # For each tweet, if there are media URLs, persist references
+        media_files: list[MediaFile] = []
+        for t in tweets:
+            if not t.media_urls:
+                continue
+            for media_url in t.media_urls:
+                media_files.append(MediaFile(
+                    id=None,
+                    tweet_id=t.tweet_id,
+                    media_type="photo" if any(media_url.lower().endswith(ext) for ext in [".jpg", ".jpeg", ".png", ".gif"]) else "video",
+                    original_url=media_url,
+                    tweet_created_at=t.created_at,
+                ))
+        return media_files
+
+    async def _enrich_authors(
+        self, user_ids: set[str]
+    ) -> list[tuple[TwitterUser, Optional[list[UserRecentTweet]]]]:
+        """Resolve all profiles in batches, then fetch recent tweets, at most N authors in flight.
+
+        An author whose profile could not be resolved is skipped. If only the recent
+        tweets fail the profile is still returned, with None for them. Failures never
+        abort the other authors. After a rate limit no more recent tweets are requested.
+        """
+        if not user_ids:
+            return []
+        # Ids the scraper could not resolve (or was rate limited on) are left out
+        profiles = await self._scraper.get_user_profiles(list(user_ids))
+        semaphore = asyncio.Semaphore(self._enrichment_concurrency)
+        rate_limited = asyncio.Event()
+
+        async def enrich(uid: str) -> tuple[TwitterUser, Optional[list[UserRecentTweet]]] | None:
+            profile = profiles.get(uid)
+            if profile is None:
+                return None  # the scraper could not resolve this author
+            async with semaphore:
+                if rate_limited.is_set():
+                    return profile, None
+                try:
+                    recent = await self._scraper.get_user_recent_tweets(uid, count=3)
+                except ScraperRateLimited:
+                    rate_limited.set()
+                    return profile, None
+                except Exception:
+                    logger.warning("Fetching recent tweets failed for user %s", uid, exc_info=True)
+                    return profile, None
+            return profile, [
+                UserRecentTweet(id=None, user_id=uid, tweet_id=t.tweet_id, text=t.text, created_at=t.created_at)
+                for t in recent
+            ]
+
+        results = await asyncio.gather(*(enrich(uid) for uid in user_ids))
+        return [r for r in results if r is not None]
+
+
+@dataclass
+class ExecutionScope:
+    """Repositories and use case bound to one database session (background work)"""
+    queries: QueryRepositoryPort
+    runs: QueryRunRepositoryPort
+    jobs: ScrapeJobRepositoryPort
+    execute_query: ExecuteQueryUseCase
@@ -0,0 +1,49 @@
+"""Maintenance commands: python -m app.cli <command>"""
+import argparse
+import asyncio
+import logging
+
+from .adapters.db.repository import SqlAlchemyStatsRepository
+from .config import init_models, build_partition_maintainer
+from .infrastructure.db import SessionLocal
+
+
+async def _migrate() -> None:
+    await init_models()
+
+
+async def _partitions() -> None:
+    await init_models()
+    removed = await build_partition_maintainer().run_once()
+    print(f"removed partitions: {', '.join(removed) or 'none'}")
+
+
+async def _backfill_stats(query_id: int | None = None) -> None:
+    await init_models()
+    async with SessionLocal() as session:
+        written = await SqlAlchemyStatsRepository(session).backfill(query_id)
+    print(f"rollup rows written: {written}")
+
+
+COMMANDS = {
+    "migrate": (_migrate, "create tables, apply migrations and convert tweets to partitions"),
+    "partitions": (_partitions, "split stranded months out of the default partitions, create upcoming ones, apply TWEET_RETENTION_MONTHS"),
+    "backfill-stats": (_backfill_stats, "rebuild query/author rollups from stored tweets (idempotent)"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        cmd = sub.add_parser(name, help=help_text)
+        if name == "backfill-stats":
+            cmd.add_argument("--query-id", type=int, help="only this query (default: everything)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    kwargs = {"query_id": args.query_id} if args.command == "backfill-stats" else {}
+    asyncio.run(COMMANDS[args.command][0](**kwargs))
+
+
+if __name__ == "__main__":
+    main()
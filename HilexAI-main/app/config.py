@@ -1,26 +1,98 @@
+import json
 import os
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator
 from fastapi import Depends
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from .infrastructure.db import get_session, Base, engine
+from .infrastructure.db import get_session, Base, engine, SessionLocal
+from .infrastructure.migrations import run_migrations
+from .infrastructure.partitions import (
+    PartitionMaintainer, set_aside_legacy_tables, copy_legacy_rows, ensure_default_partitions, ensure_future_partitions,
+    split_default_partitions, remember_months,
+)
 from .adapters.db.repository import (
     SqlAlchemyPostRepository,
     SqlAlchemyQueryRepository,
+    SqlAlchemyQueryRunRepository,
+    SqlAlchemyScrapeJobRepository,
     SqlAlchemyTwitterUserRepository,
     SqlAlchemyTweetRepository,
+    SqlAlchemyTweetMetricSnapshotRepository,
+    SqlAlchemyStatsRepository,
     SqlAlchemyMediaFileRepository,
     SqlAlchemyUserRecentTweetRepository,
 )
+from .adapters.db.unit_of_work import SqlAlchemyUnitOfWork
+from .adapters.cache.memory import InMemoryResponseCache
+from .adapters.media.downloader import AiohttpMediaDownloader, ContentAddressedStore
 from .adapters.scrapers.twikit_scraper import TwikitScraper
-from .application.use_cases import ScrapeAndStorePostsUseCase, ExecuteQueryUseCase
+from .adapters.scrapers.pool import PooledScraper
+from .application.use_cases import ScrapeAndStorePostsUseCase, ExecuteQueryUseCase, ExecutionScope
+from .application.scheduler import QueryScheduler
+from .application.jobs import ScrapeJobWorkerPool
+from .application.profile_cache import ProfileFreshnessCache
+from .domain.entities import Tweet
 from .domain.ports import (
     PostRepositoryPort, ScraperPort,
-    QueryRepositoryPort, TwitterUserRepositoryPort, TweetRepositoryPort,
-    MediaFileRepositoryPort, UserRecentTweetRepositoryPort,
+    QueryRepositoryPort, QueryRunRepositoryPort, ScrapeJobRepositoryPort, TwitterUserRepositoryPort, TweetRepositoryPort,
+    TweetMetricSnapshotRepositoryPort, StatsRepositoryPort, ResponseCachePort,
+    MediaFileRepositoryPort, MediaDownloaderPort, UserRecentTweetRepositoryPort,
 )
 
+ENRICHMENT_CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", "8"))
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "2"))
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+SCHEDULER_JITTER_SECONDS = float(os.getenv("SCHEDULER_JITTER_SECONDS", "60"))
+SCHEDULER_QUERY_LIMIT = int(os.getenv("SCHEDULER_QUERY_LIMIT", "50"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+PROFILE_MAX_AGE_SECONDS = float(os.getenv("PROFILE_MAX_AGE_SECONDS", str(6 * 3600)))
+PROFILE_NEGATIVE_TTL_SECONDS = float(os.getenv("PROFILE_NEGATIVE_TTL_SECONDS", "3600"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "50000"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+TWEET_PARTITION_MONTHS_AHEAD = int(os.getenv("TWEET_PARTITION_MONTHS_AHEAD", "3"))
+TWEET_RETENTION_MONTHS = int(os.getenv("TWEET_RETENTION_MONTHS", "0"))  # 0 keeps everything
+TWEET_RETENTION_DROP = os.getenv("TWEET_RETENTION_DROP", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")  # redis://... shares the cache between processes
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+EXECUTION_CHECKPOINT_PAGES = int(os.getenv("EXECUTION_CHECKPOINT_PAGES", "1"))  # 0: the search stage commits once
+MEDIA_DOWNLOAD_ENABLED = os.getenv("MEDIA_DOWNLOAD_ENABLED", "false").lower() in ("1", "true", "yes")
+MEDIA_STORE_DIR = os.getenv("MEDIA_STORE_DIR", "./media")
+MEDIA_DOWNLOAD_CONNECTIONS = int(os.getenv("MEDIA_DOWNLOAD_CONNECTIONS", "16"))
+MEDIA_DOWNLOAD_PER_HOST = int(os.getenv("MEDIA_DOWNLOAD_PER_HOST", "4"))
+MEDIA_DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("MEDIA_DOWNLOAD_TIMEOUT_SECONDS", "60"))
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Advisory lock key serialising schema setup across processes (e.g. uvicorn workers)
+SCHEMA_LOCK_KEY = 7_406_218_001
+
 async def init_models():
     async with engine.begin() as conn:
+        # Held until commit: a second worker waits here and then sees the finished schema
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        # Databases created before partitioning keep their rows: set aside, recreate, copy back.
+        # The table kind is read under the lock, so only one process ever converts them
+        legacy = await set_aside_legacy_tables(conn)
         await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+        await ensure_default_partitions(conn)
+        if legacy:
+            await copy_legacy_rows(conn)
+        months = await split_default_partitions(conn)
+        months += await ensure_future_partitions(conn, TWEET_PARTITION_MONTHS_AHEAD)
+    remember_months(months)
+
+def build_partition_maintainer() -> PartitionMaintainer:
+    return PartitionMaintainer(
+        engine.begin,
+        months_ahead=TWEET_PARTITION_MONTHS_AHEAD,
+        retention_months=TWEET_RETENTION_MONTHS,
+        drop_expired=TWEET_RETENTION_DROP,
+    )
 
 # DI providers
 async def get_repo(session: AsyncSession = Depends(get_session)) -> PostRepositoryPort:
@@ -32,6 +104,18 @@ async def get_tweet_repo(session: AsyncSession = Depends(get_session)) -> TweetR
 async def get_query_repo(session: AsyncSession = Depends(get_session)) -> QueryRepositoryPort:
     return SqlAlchemyQueryRepository(session)
 
+async def get_query_run_repo(session: AsyncSession = Depends(get_session)) -> QueryRunRepositoryPort:
+    return SqlAlchemyQueryRunRepository(session)
+
+async def get_job_repo(session: AsyncSession = Depends(get_session)) -> ScrapeJobRepositoryPort:
+    return SqlAlchemyScrapeJobRepository(session)
+
+async def get_snapshot_repo(session: AsyncSession = Depends(get_session)) -> TweetMetricSnapshotRepositoryPort:
+    return SqlAlchemyTweetMetricSnapshotRepository(session)
+
+async def get_stats_repo(session: AsyncSession = Depends(get_session)) -> StatsRepositoryPort:
+    return SqlAlchemyStatsRepository(session)
+
 async def get_user_repo(session: AsyncSession = Depends(get_session)) -> TwitterUserRepositoryPort:
     return SqlAlchemyTwitterUserRepository(session)
 
@@ -41,8 +125,33 @@ async def get_media_repo(session: AsyncSession = Depends(get_session)) -> MediaF
 async def get_user_recent_repo(session: AsyncSession = Depends(get_session)) -> UserRecentTweetRepositoryPort:
     return SqlAlchemyUserRecentTweetRepository(session)
 
+# One scraper per process: its authenticated session is shared by every request
+_scraper: ScraperPort | None = None
+
+def _build_scraper() -> ScraperPort:
+    # TWIKIT_ACCOUNTS='[{"email": ..., "username": ..., "password": ...}, ...]' enables pooling
+    accounts = json.loads(os.getenv("TWIKIT_ACCOUNTS", "[]"))
+    if not accounts:
+        return TwikitScraper()
+    cookies_dir = os.path.dirname(os.getenv("TWIKIT_COOKIES_PATH", ".twikit_cookies.json"))
+    return PooledScraper([
+        (acc["username"], TwikitScraper(
+            email=acc.get("email"),
+            username=acc["username"],
+            password=acc["password"],
+            cookies_path=os.path.join(cookies_dir, f".twikit_cookies.{acc['username']}.json"),
+        ))
+        for acc in accounts
+    ])
+
+def init_scraper() -> ScraperPort:
+    global _scraper
+    if _scraper is None:
+        _scraper = _build_scraper()
+    return _scraper
+
 async def get_scraper() -> ScraperPort:
-    return TwikitScraper()
+    return init_scraper()
 
 def get_use_case(
     scraper: ScraperPort = Depends(get_scraper),
@@ -50,15 +159,97 @@ def get_use_case(
 ) -> ScrapeAndStorePostsUseCase:
     return ScrapeAndStorePostsUseCase(scraper, repo)
 
-def get_execute_query_use_case(
-    scraper: ScraperPort = Depends(get_scraper),
-    query_repo: QueryRepositoryPort = Depends(get_query_repo),
-    tweet_repo: TweetRepositoryPort = Depends(get_tweet_repo),
-    user_repo: TwitterUserRepositoryPort = Depends(get_user_repo),
-    media_repo: MediaFileRepositoryPort = Depends(get_media_repo),
-    user_recent_repo: UserRecentTweetRepositoryPort = Depends(get_user_recent_repo),
-) -> ExecuteQueryUseCase:
+# Process-wide: freshness knowledge is shared by every execution
+_profile_cache = ProfileFreshnessCache(
+    max_age=timedelta(seconds=PROFILE_MAX_AGE_SECONDS),
+    negative_ttl=timedelta(seconds=PROFILE_NEGATIVE_TTL_SECONDS),
+    max_entries=PROFILE_CACHE_SIZE,
+)
+
+def get_profile_cache() -> ProfileFreshnessCache:
+    return _profile_cache
+
+def _build_response_cache() -> ResponseCachePort:
+    if RESPONSE_CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+        from .adapters.cache.redis_cache import RedisResponseCache
+        return RedisResponseCache(RESPONSE_CACHE_URL)
+    return InMemoryResponseCache(max_entries=RESPONSE_CACHE_SIZE)
+
+# Process-wide: readers and writers must see the same cache to invalidate it
+_response_cache = _build_response_cache()
+
+def get_response_cache() -> ResponseCachePort:
+    return _response_cache
+
+# Process-wide: one connection pool for every execution's downloads
+_media_downloader: MediaDownloaderPort | None = AiohttpMediaDownloader(
+    ContentAddressedStore(MEDIA_STORE_DIR),
+    connections=MEDIA_DOWNLOAD_CONNECTIONS,
+    per_host=MEDIA_DOWNLOAD_PER_HOST,
+    timeout_seconds=MEDIA_DOWNLOAD_TIMEOUT_SECONDS,
+    max_bytes=MEDIA_MAX_BYTES,
+) if MEDIA_DOWNLOAD_ENABLED else None
+
+def get_media_downloader() -> MediaDownloaderPort | None:
+    return _media_downloader
+
+def build_execute_query_use_case(session: AsyncSession) -> ExecuteQueryUseCase:
+    """Use case whose repositories share one unit of work on the given session"""
     return ExecuteQueryUseCase(
-        scraper, query_repo, tweet_repo, user_repo, media_repo, user_recent_repo
+        init_scraper(),
+        SqlAlchemyQueryRepository(session, autocommit=False),
+        SqlAlchemyTweetRepository(session, autocommit=False),
+        SqlAlchemyTwitterUserRepository(session, autocommit=False),
+        SqlAlchemyMediaFileRepository(session, autocommit=False),
+        SqlAlchemyUserRecentTweetRepository(session, autocommit=False),
+        enrichment_concurrency=ENRICHMENT_CONCURRENCY,
+        search_page_size=SEARCH_PAGE_SIZE,
+        profile_cache=_profile_cache,
+        snapshot_repo=SqlAlchemyTweetMetricSnapshotRepository(session, autocommit=False),
+        stats_repo=SqlAlchemyStatsRepository(session, autocommit=False),
+        response_cache=_response_cache,
+        media_downloader=_media_downloader,
+        unit_of_work=SqlAlchemyUnitOfWork(session),
+        checkpoint_pages=EXECUTION_CHECKPOINT_PAGES,
+    )
+
+@asynccontextmanager
+async def execution_scope() -> AsyncIterator[ExecutionScope]:
+    async with SessionLocal() as session:
+        yield ExecutionScope(
+            queries=SqlAlchemyQueryRepository(session),
+            runs=SqlAlchemyQueryRunRepository(session),
+            jobs=SqlAlchemyScrapeJobRepository(session),
+            execute_query=build_execute_query_use_case(session),
+        )
+
+async def stream_query_tweets(query_id: int) -> AsyncIterator[list[Tweet]]:
+    """Export reader with its own session: a streamed body outlives the request's dependencies"""
+    async with SessionLocal() as session:
+        async for batch in SqlAlchemyTweetRepository(session).iter_by_query(query_id, batch_size=EXPORT_BATCH_SIZE):
+            yield batch
+
+def build_scheduler() -> QueryScheduler:
+    return QueryScheduler(
+        execution_scope,
+        max_concurrency=SCHEDULER_MAX_CONCURRENCY,
+        poll_seconds=SCHEDULER_POLL_SECONDS,
+        jitter_seconds=SCHEDULER_JITTER_SECONDS,
+        query_limit=SCHEDULER_QUERY_LIMIT,
     )
 
+_job_pool: ScrapeJobWorkerPool | None = None
+
+def init_job_pool() -> ScrapeJobWorkerPool:
+    global _job_pool
+    if _job_pool is None:
+        _job_pool = ScrapeJobWorkerPool(execution_scope, workers=JOB_WORKERS)
+    return _job_pool
+
+async def get_job_pool() -> ScrapeJobWorkerPool:
+    return init_job_pool()
+
+def get_execute_query_use_case(session: AsyncSession = Depends(get_session)) -> ExecuteQueryUseCase:
+    # The request's session becomes the execution's unit of work
+    return build_execute_query_use_case(session)
+
@@ -12,6 +12,34 @@ class Query:
     is_active: bool = True
     created_at: Optional[datetime] = None
     last_run_at: Optional[datetime] = None
+    # Newest tweet ingested so far; later runs only ask for newer results
+    high_water_tweet_id: Optional[str] = None
+    high_water_created_at: Optional[datetime] = None
+
+@dataclass(slots=True, frozen=True)
+class QueryRun:
+    id: Optional[int]
+    query_id: int
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    status: str = "running"  # running, succeeded, failed, skipped
+    found: int = 0
+    saved: int = 0
+    error: Optional[str] = None
+
+@dataclass(slots=True, frozen=True)
+class ScrapeJob:
+    id: Optional[str]
+    query_id: int
+    params: dict
+    status: str = "queued"  # queued, running, succeeded, failed
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 @dataclass(slots=True, frozen=True)
 class TwitterUser:
@@ -53,6 +81,11 @@ class Tweet:
     original_url: Optional[str] = None
     scraped_at: Optional[datetime] = None
 
+@dataclass(slots=True, frozen=True)
+class TweetPage:
+    items: list[Tweet]
+    next_cursor: Optional[str] = None  # opaque; None on the last page
+
 @dataclass(slots=True, frozen=True)
 class MediaFile:
     id: Optional[int]
@@ -61,6 +94,8 @@ class MediaFile:
     original_url: str
     file_size: Optional[int] = None
     created_at: Optional[datetime] = None
+    tweet_created_at: Optional[datetime] = None  # partition key; looked up from the tweet when missing
+    sha256: Optional[str] = None  # content hash, set once the file is downloaded
 
 @dataclass(slots=True, frozen=True)
 class UserRecentTweet:
@@ -71,6 +106,81 @@ class UserRecentTweet:
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+@dataclass(slots=True, frozen=True)
+class TweetDelta:
+    """What one upsert changed about a stored tweet: all of it if new, else its metric changes"""
+    author_id: str
+    query_id: Optional[int]  # of the stored row, which keeps the query that first found it
+    created_at: datetime
+    tweets: int = 0  # 1 when the tweet was inserted
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+    quotes: int = 0
+
+@dataclass(slots=True, frozen=True)
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    deltas: tuple[TweetDelta, ...] = ()  # inserted tweets and those whose metrics changed
+
+@dataclass(slots=True, frozen=True)
+class MetricSnapshot:
+    tweet_id: str
+    observed_at: datetime
+    like_count: int = 0
+    retweet_count: int = 0
+    reply_count: int = 0
+    quote_count: int = 0
+
+@dataclass(slots=True, frozen=True)
+class TweetGrowth:
+    tweet_id: str
+    engagement_delta: int  # likes + retweets + replies + quotes, last minus first observation
+    like_delta: int
+    retweet_delta: int
+    first_observed_at: datetime
+    last_observed_at: datetime
+    observations: int
+
+@dataclass(slots=True, frozen=True)
+class QueryHourlyStats:
+    query_id: int
+    bucket: datetime  # start of the UTC hour
+    tweets: int = 0
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+    quotes: int = 0
+
+@dataclass(slots=True, frozen=True)
+class AuthorStats:
+    author_id: str
+    tweets: int = 0
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+    quotes: int = 0
+    first_tweet_at: Optional[datetime] = None
+    last_tweet_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+@dataclass(slots=True, frozen=True)
+class HashtagCount:
+    hashtag: str
+    count: int
+
+@dataclass(slots=True, frozen=True)
+class HashtagPair:
+    hashtag: str
+    other: str
+    count: int  # tweets carrying both
+
+@dataclass(slots=True, frozen=True)
+class CacheEntry:
+    body: bytes  # serialized response
+    etag: str
+
 # Legacy entity for backward compatibility
 @dataclass(slots=True, frozen=True)
 class ScrapedPost:
@@ -0,0 +1,18 @@
+from typing import Optional
+
+
+class ScraperRateLimited(Exception):
+    """The upstream account hit its rate limit.
+
+    ``reset_at`` is the epoch timestamp at which the window resets, when known.
+    """
+    def __init__(self, message: str = "rate limited", reset_at: Optional[float] = None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+class SearchTruncated(Exception):
+    """A search stream stopped before the end of the results (limit or account budget).
+
+    Everything yielded before it is valid; only the older results were not fetched.
+    """
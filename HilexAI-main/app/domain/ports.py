@@ -1,6 +1,6 @@
-from typing import Protocol, Sequence, Optional
+from typing import AsyncIterator, Protocol, Sequence, Optional
 from datetime import datetime
-from .entities import ScrapedPost, Query, TwitterUser, Tweet, MediaFile, UserRecentTweet
+from .entities import ScrapedPost, Query, QueryRun, ScrapeJob, TwitterUser, Tweet, TweetPage, MediaFile, UserRecentTweet, UpsertResult, TweetDelta, HashtagCount, HashtagPair, MetricSnapshot, TweetGrowth, QueryHourlyStats, AuthorStats, CacheEntry
 
 class ScraperPort(Protocol):
     async def search(self, query: str, limit: int = 20) -> Sequence[ScrapedPost]:
@@ -9,13 +9,38 @@ class ScraperPort(Protocol):
     async def search_tweets(self, query: Query, limit: int = 20) -> Sequence[Tweet]:
         """Enhanced search that returns Tweet entities with full metadata"""
         ...
+
+    def iter_search_tweets(
+        self, query: Query, limit: int = 20, page_size: int = 20, since_id: Optional[str] = None
+    ) -> AsyncIterator[list[Tweet]]:
+        """Stream search results one page at a time, following the result cursor up to ``limit``.
+
+        With ``since_id`` only tweets newer than it are requested, and the stream ends
+        as soon as it reaches already known tweets. A stream cut short before that (or
+        before the results ran out) raises ``SearchTruncated`` after its last page.
+        """
+        ...
     
     async def get_user_profile(self, user_id: str) -> Optional[TwitterUser]:
-        """Fetch user profile information"""
+        """Fetch user profile information; None if the user does not exist, other failures raise"""
+        ...
+
+    async def get_user_profiles(self, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+        """Fetch many profiles with as few requests as possible; unresolved ids are absent.
+
+        Failed lookups, including rate-limited ones, leave their ids out rather than raise.
+        """
+        ...
+
+    supports_user_batch: bool
+    """Whether lookup_user_profiles can resolve several ids in one request"""
+
+    async def lookup_user_profiles(self, user_ids: Sequence[str]) -> dict[str, TwitterUser]:
+        """Resolve one batch of ids with a single request; unresolved ids are absent"""
         ...
     
     async def get_user_recent_tweets(self, user_id: str, count: int = 3) -> Sequence[Tweet]:
-        """Get recent tweets from a user"""
+        """Get recent tweets from a user; [] if the user does not exist, other failures raise"""
         ...
 
 class QueryRepositoryPort(Protocol):
@@ -27,33 +52,160 @@ class QueryRepositoryPort(Protocol):
         ...
     async def update_last_run(self, query_id: int, timestamp: datetime) -> None:
         ...
+    async def advance_high_water(self, query_id: int, tweet_id: str, created_at: datetime) -> None:
+        """Record the newest ingested tweet unless a newer one is already recorded"""
+        ...
+    async def claim_run(self, query_id: int, previous_run_at: Optional[datetime], timestamp: datetime) -> bool:
+        """Atomically move last_run_at forward; False if someone else already did"""
+        ...
     async def delete(self, query_id: int) -> bool:
         ...
 
+class QueryRunRepositoryPort(Protocol):
+    async def save(self, run: QueryRun) -> QueryRun:
+        ...
+    async def list_by_query(self, query_id: int, limit: int = 20) -> list[QueryRun]:
+        ...
+
+class ScrapeJobRepositoryPort(Protocol):
+    async def create(self, job: ScrapeJob) -> ScrapeJob:
+        ...
+    async def get_by_id(self, job_id: str) -> Optional[ScrapeJob]:
+        ...
+    async def claim_next(self) -> Optional[ScrapeJob]:
+        """Mark the oldest queued job as running and return it; None if the queue is empty"""
+        ...
+    async def heartbeat(self, job_id: str, progress: Optional[dict] = None) -> None:
+        ...
+    async def finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        ...
+    async def requeue_stale(self, older_than: datetime) -> int:
+        """Put running jobs whose worker stopped heart-beating back in the queue"""
+        ...
+
 class TwitterUserRepositoryPort(Protocol):
     async def save(self, user: TwitterUser) -> TwitterUser:
         ...
+    async def save_many(self, users: list[TwitterUser]) -> list[TwitterUser]:
+        """Upsert a batch of profiles in one statement"""
+        ...
     async def get_by_id(self, user_id: str) -> Optional[TwitterUser]:
         ...
     async def get_by_username(self, username: str) -> Optional[TwitterUser]:
         ...
     async def list_for_auto_update(self) -> list[TwitterUser]:
         ...
+    async def get_updated_since(self, user_ids: list[str], since: datetime) -> dict[str, datetime]:
+        """updated_at of the given users refreshed at or after ``since``"""
+        ...
     async def update_profile(self, user: TwitterUser) -> TwitterUser:
         ...
 
 class TweetRepositoryPort(Protocol):
+    def needs_storage_for(self, tweets: list[Tweet]) -> bool:
+        """Whether saving these tweets first has to create storage for them (a new month partition)"""
+        ...
+    async def create_storage_for(self, tweets: list[Tweet]) -> None:
+        """Create and commit that storage separately; the caller's session must have no open transaction"""
+        ...
     async def save_many(self, tweets: list[Tweet]) -> int:
         ...
+    async def upsert_many(self, tweets: list[Tweet]) -> UpsertResult:
+        """Insert new tweets and refresh metrics of already stored ones"""
+        ...
     async def get_by_id(self, tweet_id: str) -> Optional[Tweet]:
         ...
     async def list_by_query(self, query_id: int, limit: int = 100) -> list[Tweet]:
         ...
     async def list_recent(self, limit: int = 50) -> list[Tweet]:
         ...
+    async def list_page(
+        self,
+        query_id: Optional[int] = None,
+        author_id: Optional[str] = None,
+        tweet_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        hashtag: Optional[str] = None,
+        mention: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> TweetPage:
+        """Newest-first keyset page; raises ValueError on a malformed cursor"""
+        ...
+    async def search_text(
+        self,
+        text: str,
+        mode: str = "web",
+        query_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        order: str = "rank",
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> TweetPage:
+        """Full-text search; mode is web, phrase or prefix, order is rank or recent.
+        Raises ValueError on an empty query or a malformed cursor"""
+        ...
+    async def top_hashtags(self, query_id: int, limit: int = 20, since: Optional[datetime] = None) -> list[HashtagCount]:
+        ...
+    async def hashtag_cooccurrence(
+        self, query_id: int, hashtag: Optional[str] = None, limit: int = 20, since: Optional[datetime] = None
+    ) -> list[HashtagPair]:
+        """Hashtags appearing together in a query's tweets; only pairs with ``hashtag`` if given"""
+        ...
+    def iter_by_query(self, query_id: int, batch_size: int = 1000) -> AsyncIterator[list[Tweet]]:
+        """Every tweet of a query, oldest first, read through a server-side cursor in batches"""
+        ...
     async def get_duplicates(self, tweet_ids: list[str]) -> set[str]:
         ...
 
+class TweetMetricSnapshotRepositoryPort(Protocol):
+    async def record(self, tweets: list[Tweet], observed_at: Optional[datetime] = None) -> int:
+        """Append a snapshot per tweet whose metrics changed since its latest one; returns rows written"""
+        ...
+    async def curve(self, tweet_id: str, since: Optional[datetime] = None, limit: int = 1000) -> list[MetricSnapshot]:
+        ...
+    async def fastest_growing(self, query_id: int, since: datetime, limit: int = 20) -> list[TweetGrowth]:
+        ...
+
+class StatsRepositoryPort(Protocol):
+    async def apply(self, deltas: list[TweetDelta]) -> None:
+        """Add what tweet upserts changed (``UpsertResult.deltas``) to the running totals"""
+        ...
+    async def backfill(self, query_id: Optional[int] = None) -> int:
+        """Rebuild rollups from stored tweets (one query, or everything); safe to re-run"""
+        ...
+    async def query_hourly(
+        self, query_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> list[QueryHourlyStats]:
+        ...
+    async def get_author(self, author_id: str) -> Optional[AuthorStats]:
+        ...
+
+class UnitOfWorkPort(Protocol):
+    """Groups the writes of several repositories into one transaction"""
+    async def commit(self) -> None:
+        ...
+    async def rollback(self) -> None:
+        ...
+
+class ResponseCachePort(Protocol):
+    """Read-through cache of serialized responses, invalidated by tag on writes"""
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+    async def set(self, key: str, entry: CacheEntry, tags: Sequence[str], ttl: float) -> None:
+        ...
+    async def invalidate(self, tags: Sequence[str]) -> None:
+        ...
+
+# Cache tags shared by readers and writers
+QUERIES_TAG = "queries"
+TWEETS_TAG = "tweets"
+
+def query_tag(query_id: int) -> str:
+    return f"query:{query_id}"
+
 class MediaFileRepositoryPort(Protocol):
     async def save(self, media_file: MediaFile) -> MediaFile:
         ...
@@ -61,10 +213,22 @@ class MediaFileRepositoryPort(Protocol):
         ...
     async def save_many(self, media_files: list[MediaFile]) -> int:
         ...
+    async def get_known_urls(self, tweet_ids: list[str]) -> set[tuple[str, str]]:
+        """(tweet_id, original_url) pairs already stored for these tweets"""
+        ...
+
+class MediaDownloaderPort(Protocol):
+    async def download_many(self, media_files: Sequence[MediaFile]) -> list[MediaFile]:
+        """Fetch and store each file; returns the stored ones with sha256 and file_size set (failed downloads are left out)"""
+        ...
+    async def close(self) -> None:
+        ...
 
 class UserRecentTweetRepositoryPort(Protocol):
     async def save_user_tweets(self, user_id: str, tweets: list[UserRecentTweet]) -> int:
         ...
+    async def save_many_user_tweets(self, tweets_by_user: dict[str, list[UserRecentTweet]]) -> int:
+        ...
     async def get_by_user(self, user_id: str) -> list[UserRecentTweet]:
         ...
 
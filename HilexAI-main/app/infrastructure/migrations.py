@@ -0,0 +1,60 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# create_all only creates missing tables; columns and indexes added to existing
+# tables are declared here as idempotent DDL and applied on every startup.
+MIGRATIONS: list[str] = [
+    # Per-query high-water mark for incremental scraping
+    "ALTER TABLE queries ADD COLUMN IF NOT EXISTS high_water_tweet_id VARCHAR(64)",
+    "ALTER TABLE queries ADD COLUMN IF NOT EXISTS high_water_created_at TIMESTAMPTZ",
+    # Keyset pagination indexes for tweet listings
+    "CREATE INDEX IF NOT EXISTS ix_tweets_created_at_tweet_id ON tweets (created_at DESC, tweet_id DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_tweets_query_created_at_tweet_id ON tweets (query_id, created_at DESC, tweet_id DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_tweets_author_created_at_tweet_id ON tweets (author_id, created_at DESC, tweet_id DESC)",
+    # Full-text search over tweet text
+    "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS search_vector TSVECTOR "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tweets_search_vector ON tweets USING gin (search_vector)",
+    # JSON -> JSONB for tweet list columns, which makes them indexable
+    """
+    DO $$
+    DECLARE col text;
+    BEGIN
+        FOREACH col IN ARRAY ARRAY['hashtags', 'mentions', 'media_urls'] LOOP
+            IF (SELECT data_type FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'tweets' AND column_name = col) = 'json' THEN
+                EXECUTE format('ALTER TABLE tweets ALTER COLUMN %I TYPE JSONB USING nullif(%I::jsonb, ''null''::jsonb)', col, col);
+            END IF;
+        END LOOP;
+    END $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tweets_hashtags ON tweets USING gin (hashtags jsonb_path_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_tweets_mentions ON tweets USING gin (mentions jsonb_path_ops)",
+    # Content hash of downloaded media
+    "ALTER TABLE media_files ADD COLUMN IF NOT EXISTS sha256 VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_media_files_sha256 ON media_files (sha256)",
+    # One-off: drop duplicate media rows (keeping a downloaded one, else the oldest), then enforce uniqueness
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('uq_media_files_tweet_url') IS NULL THEN
+            DELETE FROM media_files WHERE (id, tweet_created_at) IN (
+                SELECT id, tweet_created_at FROM (
+                    SELECT id, tweet_created_at, row_number() OVER (
+                        PARTITION BY tweet_id, original_url, tweet_created_at ORDER BY sha256 IS NULL, id
+                    ) AS n
+                    FROM media_files
+                ) ranked
+                WHERE n > 1
+            );
+            ALTER TABLE media_files ADD CONSTRAINT uq_media_files_tweet_url
+                UNIQUE (tweet_id, original_url, tweet_created_at);
+        END IF;
+    END $$
+    """,
+]
+
+
+async def run_migrations(conn: AsyncConnection) -> None:
+    for statement in MIGRATIONS:
+        await conn.execute(text(statement))
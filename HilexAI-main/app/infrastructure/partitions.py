@@ -0,0 +1,325 @@
+"""Monthly range partitions for tweets and their media files.
+
+``tweets`` is partitioned by ``created_at`` and ``media_files`` by the matching
+``tweet_created_at``; both use the same month boundaries, so a month of tweets and
+its media are created and dropped together. Retention detaches and drops whole
+partitions instead of deleting rows.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from typing import AsyncContextManager, Callable, Iterable, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# table -> partition key column
+PARTITIONED_TABLES = {"tweets": "created_at", "media_files": "tweet_created_at"}
+
+Executor = Union[AsyncConnection, AsyncSession]
+
+# Months whose partitions this process already created or found, once committed
+_known_months: set[date] = set()
+# Months whose partitions could not be created while writing: their rows are in the
+# default partitions until PartitionMaintainer moves them out
+_stranded_months: set[date] = set()
+
+# Longest partition DDL waits for locks other transactions hold on the parent tables;
+# while it waits, its queued ACCESS EXCLUSIVE request stalls every reader and writer
+DDL_LOCK_TIMEOUT = "5s"
+
+
+def month_start(value: datetime | date) -> date:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+async def create_month_partitions(conn: Executor, month: date) -> None:
+    lower, upper = month, add_months(month, 1)
+    for table in PARTITIONED_TABLES:
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{lower.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        ))
+
+
+async def ensure_default_partitions(conn: Executor) -> None:
+    """Catch-all partitions, so a row never fails to insert for lack of a month partition"""
+    for table in PARTITIONED_TABLES:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+
+
+async def ensure_future_partitions(conn: Executor, months_ahead: int, now: Optional[datetime] = None) -> list[date]:
+    """Create partitions for this month and the next ``months_ahead``; returns those months.
+
+    The caller owns the transaction; pass the months to remember_months once it committed.
+    """
+    current = month_start(now or datetime.now(timezone.utc))
+    months = [add_months(current, n) for n in range(months_ahead + 1)]
+    for month in months:
+        await create_month_partitions(conn, month)
+    return months
+
+
+def remember_months(months: Iterable[date]) -> None:
+    months = set(months)
+    _known_months.update(months)
+    _stranded_months.difference_update(months)
+
+
+def missing_months(timestamps: Iterable[datetime]) -> list[date]:
+    """Months of these timestamps whose partitions this process has not seen yet.
+
+    Months left to partition maintenance are not reported again: the default partition
+    already holds rows of them, so creating their partitions while writing would fail.
+    """
+    return sorted({month_start(ts) for ts in timestamps} - _known_months - _stranded_months)
+
+
+async def ensure_partitions_for(engine: AsyncEngine, timestamps: Iterable[datetime]) -> None:
+    """Create month partitions for incoming rows (e.g. old tweets) before they are written.
+
+    Each month is created and committed on a connection of its own. Inside the
+    writer's transaction the new partition would keep the parent tables locked until
+    that transaction ended, and a rollback would silently drop it again. The DDL
+    waits on transactions that touched the tables, so callers must not have one
+    open themselves. If creation fails (for instance because the default partition
+    already holds rows of that month, or the lock is not granted within
+    DDL_LOCK_TIMEOUT) the rows land in the default partition, and the month is left
+    to PartitionMaintainer, which moves them out when it creates the partition.
+    """
+    months = missing_months(timestamps)
+    if not months:
+        return
+    async with engine.connect() as conn:
+        for month in months:
+            try:
+                async with conn.begin():
+                    await conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+                    await create_month_partitions(conn, month)
+            except DBAPIError:
+                logger.warning(
+                    "Could not create partitions for %s; rows go to the default partition until maintenance moves them",
+                    month, exc_info=True,
+                )
+                _stranded_months.add(month)
+                continue
+            # Only now: the partitions are committed
+            _known_months.add(month)
+
+
+async def list_month_partitions(conn: Executor, table: str) -> list[date]:
+    rows = (await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {"table": table})).scalars().all()
+    prefix = f"{table}_p"
+    months = []
+    for name in rows:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            months.append(date(int(suffix[:4]), int(suffix[4:]), 1))
+    return sorted(months)
+
+
+async def _insertable_columns(conn: Executor, table: str) -> str:
+    # Generated columns (tweets.search_vector) cannot be inserted
+    columns = (await conn.execute(text(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() "
+        "AND table_name = :table AND is_generated = 'NEVER' ORDER BY ordinal_position"
+    ), {"table": table})).scalars().all()
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+async def split_default_partitions(conn: Executor) -> list[date]:
+    """Give months stranded in the default partitions their own partitions; returns those months.
+
+    A partition cannot be created while the default partition holds rows of its
+    month, so each month's rows are set aside in a temporary table, deleted from the
+    default, and inserted again once the month's partitions exist. Writers are held
+    off the default partitions until the caller's transaction ends; pass the months
+    to remember_months once it committed.
+    """
+    months: set[date] = set()
+    for table, key in PARTITIONED_TABLES.items():
+        months.update((await conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', {key} AT TIME ZONE 'UTC')::date FROM {table}_default"
+        ))).scalars().all())
+    if not months:
+        return []
+    await conn.execute(text(f"LOCK TABLE {', '.join(f'{t}_default' for t in PARTITIONED_TABLES)} IN EXCLUSIVE MODE"))
+    for month in sorted(months):
+        lower, upper = month, add_months(month, 1)
+        in_month = {
+            table: f"{key} >= '{lower.isoformat()} 00:00:00+00' AND {key} < '{upper.isoformat()} 00:00:00+00'"
+            for table, key in PARTITIONED_TABLES.items()
+        }
+        for table in PARTITIONED_TABLES:
+            await conn.execute(text(
+                f"CREATE TEMPORARY TABLE stranded_{table} AS SELECT * FROM {table}_default WHERE {in_month[table]}"
+            ))
+            await conn.execute(text(f"DELETE FROM {table}_default WHERE {in_month[table]}"))
+        await create_month_partitions(conn, month)
+        # Tweets before their media files, in PARTITIONED_TABLES order
+        for table in PARTITIONED_TABLES:
+            columns = await _insertable_columns(conn, table)
+            moved = (await conn.execute(text(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM stranded_{table}"
+            ))).rowcount
+            await conn.execute(text(f"DROP TABLE stranded_{table}"))
+            logger.info("Moved %s rows of %s out of %s_default", moved, partition_name(table, month), table)
+    return sorted(months)
+
+
+async def apply_retention(
+    conn: Executor, retention_months: int, drop: bool = True, now: Optional[datetime] = None
+) -> list[str]:
+    """Detach (and drop) month partitions entirely older than the retention window"""
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -retention_months)
+    removed = []
+    for table, key in PARTITIONED_TABLES.items():
+        for month in await list_month_partitions(conn, table):
+            if add_months(month, 1) > cutoff:
+                continue
+            name = partition_name(table, month)
+            await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if drop:
+                await conn.execute(text(f"DROP TABLE {name}"))
+            _known_months.discard(month)
+            removed.append(name)
+        # Stragglers in the default partition are the only rows that still need a DELETE
+        await conn.execute(
+            text(f"DELETE FROM {table}_default WHERE {key} < :cutoff"),
+            {"cutoff": datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)},
+        )
+    return removed
+
+
+async def _table_kind(conn: AsyncConnection, table: str) -> Optional[str]:
+    return (await conn.execute(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    )).scalar()
+
+
+async def set_aside_legacy_tables(conn: AsyncConnection) -> bool:
+    """Rename unpartitioned tweets/media_files (pre-partitioning schema) out of the way.
+
+    Runs before create_all, which then creates the partitioned tables; index and
+    sequence names are global, so those are renamed along with the tables.
+    """
+    if await _table_kind(conn, "tweets") != "r":
+        return False
+    logger.warning("Converting tweets and media_files to partitioned tables")
+    for table in PARTITIONED_TABLES:
+        if await _table_kind(conn, table) != "r":
+            continue
+        legacy = f"{table}_legacy"
+        indexes = (await conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+            {"table": table},
+        )).scalars().all()
+        await conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        for index in indexes:
+            await conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index}_legacy"'))
+        sequence = (await conn.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": legacy}
+        )).scalar() if table == "media_files" else None
+        if sequence:
+            await conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {legacy}_id_seq"))
+    return True
+
+
+async def copy_legacy_rows(conn: AsyncConnection) -> int:
+    """Move rows of the renamed legacy tables into the partitioned ones, then drop them"""
+    months = (await conn.execute(text(
+        "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date FROM tweets_legacy"
+    ))).scalars().all()
+    for month in months:
+        await create_month_partitions(conn, month)
+    copied = (await conn.execute(text(
+        "INSERT INTO tweets (tweet_id, text, author_id, created_at, retweet_count, like_count, reply_count, "
+        "quote_count, tweet_type, hashtags, mentions, media_urls, query_id, source, original_url, scraped_at) "
+        "SELECT tweet_id, text, author_id, created_at, retweet_count, like_count, reply_count, quote_count, "
+        "tweet_type, nullif(hashtags::jsonb, 'null'), nullif(mentions::jsonb, 'null'), nullif(media_urls::jsonb, 'null'), query_id, source, original_url, scraped_at "
+        "FROM tweets_legacy"
+    ))).rowcount
+    if await _table_kind(conn, "media_files_legacy") == "r":
+        await conn.execute(text(
+            "INSERT INTO media_files (id, tweet_created_at, tweet_id, media_type, original_url, file_size, created_at) "
+            "SELECT m.id, t.created_at, m.tweet_id, m.media_type, m.original_url, m.file_size, m.created_at "
+            "FROM media_files_legacy m JOIN tweets_legacy t ON t.tweet_id = m.tweet_id "
+            "ORDER BY m.id ON CONFLICT DO NOTHING"  # legacy duplicates: the oldest row wins
+        ))
+        await conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('media_files', 'id'), coalesce(max(id), 0) + 1, false) FROM media_files"
+        ))
+        await conn.execute(text("DROP TABLE media_files_legacy"))
+    await conn.execute(text("DROP TABLE tweets_legacy"))
+    logger.warning("Moved %s tweets into monthly partitions", copied)
+    return copied
+
+
+class PartitionMaintainer:
+    """Periodically creates upcoming month partitions and applies the retention policy"""
+
+    def __init__(
+        self,
+        connect: Callable[[], AsyncContextManager[AsyncConnection]],
+        months_ahead: int = 3,
+        retention_months: int = 0,
+        drop_expired: bool = True,
+        interval_seconds: float = 6 * 3600,
+    ) -> None:
+        self._connect = connect
+        self._months_ahead = months_ahead
+        self._retention_months = retention_months
+        self._drop_expired = drop_expired
+        self._interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self) -> list[str]:
+        async with self._connect() as conn:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+            removed = await apply_retention(conn, self._retention_months, drop=self._drop_expired)
+            # Stranded rows first: a future month in the default partition would block its creation
+            months = await split_default_partitions(conn)
+            months += await ensure_future_partitions(conn, self._months_ahead)
+        remember_months(months)
+        if removed:
+            logger.info("Retention removed partitions: %s", ", ".join(removed))
+        return removed
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(self._interval)
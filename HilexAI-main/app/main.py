@@ -2,7 +2,12 @@ import os
 from fastapi import FastAPI
 from .adapters.api.routers.scrape import router as scrape_router
 from .adapters.api.routers.queries import router as queries_router
-from .config import init_models
+from .adapters.api.routers.tweets import router as tweets_router
+from .adapters.api.routers.users import router as users_router
+from .config import (
+    init_models, init_scraper, init_job_pool, build_scheduler, build_partition_maintainer, get_media_downloader,
+    SCHEDULER_ENABLED,
+)
 
 def create_app() -> FastAPI:
     app = FastAPI(title="FastAPI Hex Scraper", version="0.1.0")
@@ -10,10 +15,30 @@ def create_app() -> FastAPI:
     # Include routers
     app.include_router(scrape_router)
     app.include_router(queries_router)
+    app.include_router(tweets_router)
+    app.include_router(users_router)
 
     @app.on_event("startup")
     async def startup():
         await init_models()
+        init_scraper()
+        init_job_pool().start()
+        app.state.partitions = build_partition_maintainer()
+        app.state.partitions.start()
+        if SCHEDULER_ENABLED:
+            app.state.scheduler = build_scheduler()
+            app.state.scheduler.start()
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        scheduler = getattr(app.state, "scheduler", None)
+        if scheduler:
+            await scheduler.stop()
+        await init_job_pool().stop()
+        await app.state.partitions.stop()
+        downloader = get_media_downloader()
+        if downloader:
+            await downloader.close()
 
     @app.get("/healthz")
     async def healthz():
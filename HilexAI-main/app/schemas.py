@@ -26,6 +26,18 @@ class QueryResponse(BaseModel):
     is_active: bool
     created_at: datetime
     last_run_at: Optional[datetime] = None
+    high_water_tweet_id: Optional[str] = None
+    high_water_created_at: Optional[datetime] = None
+
+class QueryRunResponse(BaseModel):
+    id: int
+    query_id: int
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    status: str
+    found: int
+    saved: int
+    error: Optional[str] = None
 
 # Twitter User Schemas
 class TwitterUserResponse(BaseModel):
@@ -64,6 +76,66 @@ class TweetResponse(BaseModel):
     original_url: Optional[str] = None
     scraped_at: datetime
 
+class TweetPageResponse(BaseModel):
+    items: list[TweetResponse]
+    next_cursor: Optional[str] = None
+
+class MetricSnapshotResponse(BaseModel):
+    tweet_id: str
+    observed_at: datetime
+    like_count: int
+    retweet_count: int
+    reply_count: int
+    quote_count: int
+
+class TweetGrowthResponse(BaseModel):
+    tweet_id: str
+    engagement_delta: int
+    like_delta: int
+    retweet_delta: int
+    first_observed_at: datetime
+    last_observed_at: datetime
+    observations: int
+
+class HourlyStatsResponse(BaseModel):
+    bucket: datetime
+    tweets: int
+    likes: int
+    retweets: int
+    replies: int
+    quotes: int
+
+class QueryStatsResponse(BaseModel):
+    query_id: int
+    tweets: int
+    likes: int
+    retweets: int
+    replies: int
+    quotes: int
+    hourly: list[HourlyStatsResponse]
+
+class AuthorStatsResponse(BaseModel):
+    author_id: str
+    tweets: int
+    likes: int
+    retweets: int
+    replies: int
+    quotes: int
+    avg_likes: float
+    avg_retweets: float
+    first_tweet_at: Optional[datetime] = None
+    last_tweet_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class HashtagCountResponse(BaseModel):
+    hashtag: str
+    count: int
+
+class HashtagPairResponse(BaseModel):
+    hashtag: str
+    other: str
+    count: int
+
 class MediaFileResponse(BaseModel):
     id: int
     tweet_id: str
@@ -83,17 +155,43 @@ class UserRecentTweetResponse(BaseModel):
 # Enhanced Scraping Schemas
 class EnhancedScrapeRequest(BaseModel):
     query_id: int = Field(..., description="ID of the query to execute")
-    limit: int = Field(20, ge=1, le=1000)
+    limit: int = Field(20, ge=1, le=10000)
     include_media: bool = Field(True, description="Whether to download and store media files")
     update_user_profiles: bool = Field(True, description="Whether to update user profile information")
+    incremental: bool = Field(True, description="Only fetch tweets newer than the query's high-water mark")
 
 class ScrapeResult(BaseModel):
     found: int
     saved: int
+    updated: int = 0
     media_files_saved: int = 0
     users_updated: int = 0
+    users_failed: int = 0
+    users_cached: int = 0
+    snapshots: int = 0
     query_id: Optional[int] = None
 
+class ScrapeJobResponse(BaseModel):
+    id: str
+    query_id: int
+    status: str  # queued, running, succeeded, failed
+    progress: Optional[dict] = None
+    result: Optional[ScrapeResult] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ProfileCacheStatsResponse(BaseModel):
+    entries: int
+    hits: int
+    negative_hits: int
+    db_hits: int
+    misses: int
+    max_age_seconds: float
+    negative_ttl_seconds: float
+
 class BulkScrapeRequest(BaseModel):
     queries: list[int] = Field(..., description="List of query IDs to execute")
     limit_per_query: int = Field(50, ge=1, le=1000)
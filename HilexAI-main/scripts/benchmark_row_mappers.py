@@ -0,0 +1,83 @@
+"""Read-path benchmark for the repository row mappers.
+
+Seeds a scratch database (``DATABASE_URL``) with users and tweets under a query
+named ``bench-row-mappers`` on the first run, then times the bulk reads that go
+through the column-level row mappers, each round in a fresh session:
+
+    python -m scripts.benchmark_row_mappers [--rows 10000] [--rounds 15]
+
+To compare with the ORM read path, run the same command on a checkout of the
+commit before the mappers were introduced, against the same database.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.adapters.db.repository import SqlAlchemyQueryRepository, SqlAlchemyTweetRepository, SqlAlchemyTwitterUserRepository
+from app.config import init_models
+from app.domain.entities import Query, Tweet, TwitterUser
+from app.infrastructure.db import SessionLocal, engine
+
+QUERY_NAME = "bench-row-mappers"
+AUTHORS = 500
+
+
+async def seed(rows: int) -> int:
+    """Id of the benchmark query, creating its users and tweets if they are not there yet"""
+    await init_models()
+    async with SessionLocal() as session:
+        query_id = (await session.execute(
+            text("SELECT q.id FROM queries q WHERE q.name = :name AND EXISTS (SELECT 1 FROM tweets t WHERE t.query_id = q.id)"),
+            {"name": QUERY_NAME},
+        )).scalar()
+        if query_id:
+            return query_id
+        await SqlAlchemyTwitterUserRepository(session).save_many([
+            TwitterUser(user_id=f"bench{i}", username=f"bench{i}", display_name=f"Bench {i}", bio="bio",
+                        followers_count=i, auto_update=True)
+            for i in range(rows)
+        ])
+        query = await SqlAlchemyQueryRepository(session).save(Query(id=None, name=QUERY_NAME, search_text="bench"))
+        start = datetime(2026, 9, 1, tzinfo=timezone.utc)
+        await SqlAlchemyTweetRepository(session).save_many([
+            Tweet(tweet_id=str(9_000_000_000 + i), text=f"bench tweet {i} #a #b", author_id=f"bench{i % AUTHORS}",
+                  created_at=start + timedelta(seconds=i), like_count=i, hashtags=["a", "b"], mentions=["x"],
+                  media_urls=[], query_id=query.id)
+            for i in range(rows)
+        ])
+        return query.id
+
+
+async def bench(name: str, read, rows: int, rounds: int) -> None:
+    times = []
+    for _ in range(rounds):
+        async with SessionLocal() as session:
+            started = time.perf_counter()
+            result = await read(session)
+            times.append(time.perf_counter() - started)
+        assert len(result) >= rows, f"{name} returned {len(result)} rows; seed more or lower --rows"
+    median = statistics.median(times)
+    print(f"{name:34s} median {median * 1000:7.1f} ms  {median / rows * 1e6:5.1f} us/row")
+
+
+async def main(rows: int, rounds: int) -> None:
+    query_id = await seed(rows)
+    await bench(f"tweets.list_by_query({rows})",
+                lambda s: SqlAlchemyTweetRepository(s).list_by_query(query_id, limit=rows), rows, rounds)
+    await bench(f"tweets.list_recent({rows})",
+                lambda s: SqlAlchemyTweetRepository(s).list_recent(limit=rows), rows, rounds)
+    await bench("users.list_for_auto_update",
+                lambda s: SqlAlchemyTwitterUserRepository(s).list_for_auto_update(), rows, rounds)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m scripts.benchmark_row_mappers")
+    parser.add_argument("--rows", type=int, default=10_000, help="rows seeded and read per call (default 10000)")
+    parser.add_argument("--rounds", type=int, default=15, help="timed reads per benchmark (default 15)")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.rounds))
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+
+from aiohttp import web
+
+from app.adapters.media.downloader import AiohttpMediaDownloader, ContentAddressedStore
+from app.domain.entities import MediaFile
+
+MAX_BYTES = 64 * 1024
+
+
+class MediaServer:
+    """Stub CDN: counts hits and concurrent requests, and serves a few special names"""
+
+    def __init__(self) -> None:
+        self.hits: dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.flaky_failures = 1
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        name = request.match_info["name"]
+        self.hits[name] = self.hits.get(name, 0) + 1
+        if name == "missing.jpg":
+            return web.Response(status=404)
+        if name == "flaky.jpg" and self.flaky_failures:
+            self.flaky_failures -= 1
+            return web.Response(status=503)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.in_flight -= 1
+        if name.startswith("same"):
+            body = b"identical bytes" * 100
+        elif name == "huge.mp4":
+            body = b"x" * (MAX_BYTES + 1)
+        else:
+            body = name.encode() * 100
+        return web.Response(body=body)
+
+    async def __aenter__(self) -> "MediaServer":
+        app = web.Application()
+        app.router.add_get("/media/{name}", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}/media/"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._runner.cleanup()
+
+
+def media(server: MediaServer, tweet_id: str, name: str) -> MediaFile:
+    return MediaFile(id=None, tweet_id=tweet_id, media_type="photo", original_url=server.base_url + name)
+
+
+def stored_files(store: ContentAddressedStore) -> list:
+    return sorted(p for p in store.root.rglob("*") if p.is_file())
+
+
+def test_downloads_are_capped_per_host(tmp_path):
+    store = ContentAddressedStore(tmp_path)
+
+    async def run() -> tuple[MediaServer, list[MediaFile]]:
+        downloader = AiohttpMediaDownloader(store, connections=8, per_host=2, max_bytes=MAX_BYTES)
+        async with MediaServer() as server:
+            try:
+                files = await downloader.download_many([media(server, str(i), f"p{i}.jpg") for i in range(8)])
+            finally:
+                await downloader.close()
+        return server, files
+
+    server, files = asyncio.run(run())
+
+    assert len(files) == 8
+    assert server.max_in_flight == 2
+
+
+def test_identical_content_is_stored_once_and_urls_fetched_once(tmp_path):
+    store = ContentAddressedStore(tmp_path)
+
+    async def run() -> tuple[MediaServer, list[MediaFile]]:
+        downloader = AiohttpMediaDownloader(store, max_bytes=MAX_BYTES)
+        async with MediaServer() as server:
+            try:
+                files = await downloader.download_many([
+                    media(server, "1", "same-a.jpg"),
+                    media(server, "2", "same-b.jpg"),
+                    media(server, "3", "same-a.jpg"),
+                ])
+            finally:
+                await downloader.close()
+        return server, files
+
+    server, files = asyncio.run(run())
+
+    # Every tweet gets its attachment, but the shared URL was requested once
+    assert [m.tweet_id for m in files] == ["1", "2", "3"]
+    assert server.hits == {"same-a.jpg": 1, "same-b.jpg": 1}
+    sha256 = hashlib.sha256(b"identical bytes" * 100).hexdigest()
+    assert {m.sha256 for m in files} == {sha256}
+    assert {m.file_size for m in files} == {len(b"identical bytes" * 100)}
+    # Two URLs, one copy in the store
+    assert stored_files(store) == [store.path_for(sha256)]
+
+
+def test_failed_downloads_are_left_out_and_retried_later(tmp_path):
+    store = ContentAddressedStore(tmp_path)
+
+    async def run() -> tuple[MediaServer, list[MediaFile], list[MediaFile]]:
+        downloader = AiohttpMediaDownloader(store, max_bytes=MAX_BYTES)
+        async with MediaServer() as server:
+            try:
+                batch = [
+                    media(server, "1", "ok.jpg"),
+                    media(server, "2", "missing.jpg"),
+                    media(server, "3", "huge.mp4"),
+                    media(server, "4", "flaky.jpg"),
+                ]
+                first = await downloader.download_many(batch)
+                # Nothing was recorded for the failures, so the next run asks for them again
+                second = await downloader.download_many(batch[1:])
+            finally:
+                await downloader.close()
+        return server, first, second
+
+    server, first, second = asyncio.run(run())
+
+    assert [m.tweet_id for m in first] == ["1"]
+    assert [m.tweet_id for m in second] == ["4"]
+    assert server.hits["flaky.jpg"] == 2
+    assert server.hits["missing.jpg"] == 2
+    # Abandoned downloads leave no temporary files behind
+    assert list((tmp_path / "tmp").iterdir()) == []
+    assert stored_files(store) == sorted(store.path_for(m.sha256) for m in first + second)
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from twikit.tweet import Tweet as TwikitTweet
+
+from app.adapters.scrapers.twikit_scraper import TwikitScraper
+from app.domain.entities import Query
+from app.domain.errors import SearchTruncated
+
+BLOCK_SECONDS = 0.3
+TICK_SECONDS = 0.01
+
+
+class Results(list):
+    next_cursor = None
+
+
+class BlockingClient:
+    """Synchronous twikit-like client whose calls block the calling thread"""
+
+    def __init__(self) -> None:
+        self.logins = 0
+
+    def login(self, **credentials) -> None:
+        self.logins += 1
+
+    def search_tweet(self, query, product, count=20, cursor=None):
+        time.sleep(BLOCK_SECONDS)
+        user = SimpleNamespace(id="42", screen_name="author")
+        return Results(
+            SimpleNamespace(id=str(100 + i), text="hello", user=user, created_at=datetime.now(timezone.utc))
+            for i in range(count)
+        )
+
+
+def test_blocking_client_does_not_stall_the_event_loop(tmp_path):
+    client = BlockingClient()
+    scraper = TwikitScraper(client=client, cookies_path=str(tmp_path / "cookies.json"))
+    query = Query(id=1, name="q", search_text="hello")
+
+    async def run() -> tuple[int, list[list]]:
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(TICK_SECONDS)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        pages = [page async for page in scraper.iter_search_tweets(query, limit=5, page_size=5)]
+        stop.set()
+        await task
+        return ticks, pages
+
+    ticks, pages = asyncio.run(run())
+
+    assert client.logins == 1
+    assert [len(page) for page in pages] == [5]
+    # The ticker kept running while the client call blocked its worker thread
+    assert ticks >= (BLOCK_SECONDS / TICK_SECONDS) / 2
+
+
+def twikit_tweet(tweet_id: str) -> TwikitTweet:
+    """A real twikit Tweet built from a trimmed-down search payload"""
+    data = {
+        "rest_id": tweet_id,
+        "edit_control": {},
+        "legacy": {
+            "created_at": "Wed Oct 14 09:30:00 +0000 2026",
+            "full_text": "Shipping #Python and #AsyncIO with @Alice and @bob",
+            "lang": "en",
+            "is_quote_status": False,
+            "quote_count": 1,
+            "reply_count": 2,
+            "favorite_count": 3,
+            "favorited": False,
+            "retweet_count": 4,
+            "entities": {
+                "hashtags": [{"text": "Python"}, {"text": "AsyncIO"}],
+                "user_mentions": [{"screen_name": "Alice", "id_str": "1"}, {"screen_name": "bob", "id_str": "2"}],
+                "urls": [],
+            },
+        },
+    }
+    user = SimpleNamespace(id="42", screen_name="author")
+    return TwikitTweet(None, data, user)
+
+
+class TwikitResultsClient:
+    async def login(self, **credentials) -> None:
+        pass
+
+    async def search_tweet(self, query, product, count=20, cursor=None):
+        return Results([twikit_tweet("200")])
+
+
+def test_entities_are_read_from_real_twikit_tweets(tmp_path):
+    scraper = TwikitScraper(client=TwikitResultsClient(), cookies_path=str(tmp_path / "cookies.json"))
+    query = Query(id=1, name="q", search_text="python")
+
+    async def run() -> list:
+        return [t async for page in scraper.iter_search_tweets(query, limit=1) for t in page]
+
+    [tweet] = asyncio.run(run())
+
+    assert tweet.tweet_id == "200"
+    assert tweet.hashtags == ["python", "asyncio"]
+    assert tweet.mentions == ["alice", "bob"]
+    assert (tweet.like_count, tweet.retweet_count, tweet.reply_count, tweet.quote_count) == (3, 4, 2, 1)
+    assert tweet.created_at == datetime(2026, 10, 14, 9, 30, tzinfo=timezone.utc)
+
+
+class PagedClient:
+    """Newest-first search over tweet ids 130..101, with a cursor while results remain"""
+
+    async def login(self, **credentials) -> None:
+        pass
+
+    async def search_tweet(self, query, product, count=20, cursor=None):
+        start = int(cursor or 130)
+        user = SimpleNamespace(id="42", screen_name="author")
+        results = Results(
+            SimpleNamespace(id=str(i), text="hello", user=user, created_at=datetime.now(timezone.utc))
+            for i in range(start, max(start - count, 100), -1)
+        )
+        if start - count > 100:
+            results.next_cursor = str(start - count)
+        return results
+
+
+def test_search_stream_tells_truncation_from_the_end_of_results(tmp_path):
+    scraper = TwikitScraper(client=PagedClient(), cookies_path=str(tmp_path / "cookies.json"))
+    query = Query(id=1, name="q", search_text="hello")
+
+    async def collect(**kwargs) -> list[str]:
+        ids: list[str] = []
+        try:
+            async for page in scraper.iter_search_tweets(query, page_size=10, **kwargs):
+                ids.extend(t.tweet_id for t in page)
+        except SearchTruncated:
+            ids.append("truncated")
+        return ids
+
+    # Stopped by the limit with results left: the caller must not treat it as complete
+    assert asyncio.run(collect(limit=15)) == [str(i) for i in range(130, 115, -1)] + ["truncated"]
+    # Reaching the known mark or the last result ends the stream normally
+    assert asyncio.run(collect(limit=50, since_id="112")) == [str(i) for i in range(130, 112, -1)]
+    assert asyncio.run(collect(limit=50)) == [str(i) for i in range(130, 100, -1)]